@@ -1,27 +1,42 @@
 """PyDID."""
 
 import logging
-from typing import Callable, List, Optional, Type
+from typing import Callable, List, Optional, Type, Union
 
+from .cache import DocumentCache
 from .common import DIDError
 from .did import DID, InvalidDIDError
 from .did_url import DIDUrl, InvalidDIDUrlError
 from .doc import corrections, generic
 from .doc.builder import DIDDocumentBuilder
+from .doc.collection import DIDDocumentCollection
+from .doc.corrections import Correction, CorrectionPipeline
+from .doc.diff import DocumentDiff, diff_documents, patch_document
+from .doc.template import DocumentTemplate
 from .doc.doc import (
     BaseDIDDocument,
     BasicDIDDocument,
     DIDDocument,
     DIDDocumentError,
     NonconformantDocument,
+    SalvageDiagnostic,
 )
+from .registry import register_service, register_verification_method
 from .resource import Resource
 from .service import (
     DIDCommService,
     DIDCommV1Service,
     DIDCommV2Service,
     DIDCommV2ServiceEndpoint,
+    LazyEndpoint,
     Service,
+    lazy_endpoints,
+)
+from .validation import (
+    DocumentLimits,
+    LimitExceededError,
+    WrappedValidationError,
+    check_limits,
 )
 from .verification_method import (
     VerificationMaterial,
@@ -31,6 +46,8 @@ from .verification_method import (
 
 __all__ = [
     "BasicDIDDocument",
+    "Correction",
+    "CorrectionPipeline",
     "DID",
     "DIDCommService",
     "DIDCommV1Service",
@@ -38,16 +55,30 @@ __all__ = [
     "DIDCommV2ServiceEndpoint",
     "DIDDocument",
     "DIDDocumentBuilder",
+    "DIDDocumentCollection",
     "DIDDocumentError",
     "DIDError",
     "DIDUrl",
+    "DocumentCache",
+    "DocumentDiff",
+    "DocumentLimits",
+    "DocumentTemplate",
     "InvalidDIDError",
     "InvalidDIDUrlError",
+    "LazyEndpoint",
+    "LimitExceededError",
     "Service",
     "VerificationMethod",
     "VerificationMaterial",
     "VerificationMaterialUnknown",
+    "WrappedValidationError",
     "Resource",
+    "SalvageDiagnostic",
+    "register_service",
+    "register_verification_method",
+    "lazy_endpoints",
+    "diff_documents",
+    "patch_document",
     "generic",
     "corrections",
 ]
@@ -58,23 +89,89 @@ LOGGER = logging.getLogger(__name__)
 
 def deserialize_document(
     value: dict,
-    corrections: Optional[List[Callable]] = None,
+    corrections: Union[List[Callable], CorrectionPipeline, None] = None,
     *,
     strict: bool = False,
+    salvage: bool = False,
     cls: Optional[Type[BaseDIDDocument]] = None,
+    limits: Optional[DocumentLimits] = None,
+    cache: Optional[DocumentCache] = None,
+) -> BaseDIDDocument:
+    """Deserialize a document from a dictionary.
+
+    With salvage, the document is validated item by item in a single pass;
+    items failing validation are kept raw and reported in the diagnostics of
+    the returned document rather than falling back to a NonconformantDocument.
+
+    Corrections may be given as a list or as a CorrectionPipeline built once
+    and reused across documents. Corrections given as a list update value in
+    place; use a CorrectionPipeline with copy_on_write to leave it untouched.
+
+    With limits, documents exceeding them are rejected with a
+    LimitExceededError before any other processing, regardless of strict.
+
+    With cache, documents previously deserialized from equal values with the
+    same options are returned from the cache without repeating corrections or
+    validation. Documents that fail to deserialize are not cached.
+    """
+    if salvage and not strict and cls is not None and not hasattr(cls, "salvage"):
+        raise ValueError("{} does not support salvage".format(cls.__name__))
+
+    if limits is not None:
+        check_limits(value, limits)
+
+    if cache is None:
+        return _deserialize_document(value, corrections, strict, salvage, cls)
+
+    if isinstance(corrections, CorrectionPipeline):
+        corrections_key = (corrections,)
+    else:
+        corrections_key = tuple(corrections or ())
+    keyed = cache.key(value, corrections_key, strict, salvage, cls, limits)
+    if keyed is None:
+        return _deserialize_document(value, corrections, strict, salvage, cls)
+
+    key, size = keyed
+    doc = cache.get(key)
+    if doc is None:
+        doc = _deserialize_document(value, corrections, strict, salvage, cls)
+        cache.put(key, size, doc)
+    return doc
+
+
+def _deserialize_document(
+    value: dict,
+    corrections: Union[List[Callable], CorrectionPipeline, None],
+    strict: bool,
+    salvage: bool,
+    cls: Optional[Type[BaseDIDDocument]],
 ) -> BaseDIDDocument:
-    """Deserialize a document from a dictionary."""
+    """Deserialize a document without consulting a cache or checking limits."""
     if corrections:
-        for correction in corrections:
-            value = correction(value)
+        if not isinstance(corrections, CorrectionPipeline):
+            corrections = CorrectionPipeline(corrections)
+        value = corrections(value)
 
     cls = cls or DIDDocument
+    if salvage and not strict:
+        return cls.salvage(value)
+    # Indexing is otherwise deferred; building the index rejects documents
+    # holding differing resources under the same id
     if strict:
-        return cls.deserialize(value)
+        return cls.deserialize(value).build_index()
     try:
-        return cls.deserialize(value)
+        return cls.deserialize(value).build_index()
     except ValueError as error:
-        LOGGER.warning("Failed to deserialize document: %s", error)
+        # Message rendering is deferred to the handlers of the debug record
+        LOGGER.warning(
+            "Failed to deserialize document %s: %s validation error(s)",
+            value.get("id"),
+            error.error_count() if isinstance(error, WrappedValidationError) else 1,
+        )
+        LOGGER.debug("Validation errors: %s", error)
+        LOGGER.info("Parsing document as non-conformant doc")
+    except DIDDocumentError as error:
+        LOGGER.warning("Failed to index document %s: %s", value.get("id"), error)
         LOGGER.info("Parsing document as non-conformant doc")
 
     return NonconformantDocument.deserialize(value)
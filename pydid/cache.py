@@ -0,0 +1,95 @@
+"""Cache of deserialized DID Documents keyed on their raw content."""
+
+import hashlib
+import json
+from collections import OrderedDict
+from copy import copy
+from typing import TYPE_CHECKING, Any, Hashable, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .doc.doc import BaseDIDDocument
+
+
+class DocumentCache:
+    """Least recently used cache of deserialized documents.
+
+    Entries are keyed by a hash of the raw document together with the options
+    it was deserialized with, including the corrections applied. The cache is
+    bounded by number of entries and, optionally, by the total size of the raw
+    documents held, measured as their compact JSON encoding.
+
+    With clone, the default, hits return a shallow copy of the cached
+    document: its sections are its own but resources are shared with the cached
+    document. Without clone, hits return the cached document itself, which must
+    then not be modified by callers.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: Optional[int] = None,
+        clone: bool = True,
+    ):
+        """Initialize cache."""
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clone = clone
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[BaseDIDDocument, int]]" = (
+            OrderedDict()
+        )
+
+    @staticmethod
+    def key(value: Any, *options: Hashable) -> Optional[Tuple[Hashable, int]]:
+        """Return the cache key and size of a raw document and options.
+
+        Returns None if value cannot be encoded as JSON, including values nested
+        too deeply to encode, and so cannot be cached.
+        """
+        try:
+            raw = json.dumps(
+                value, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+            ).encode()
+        except (TypeError, ValueError, RecursionError):
+            return None
+        return (hashlib.blake2b(raw, digest_size=16).digest(), options), len(raw)
+
+    def get(self, key: Hashable) -> Optional["BaseDIDDocument"]:
+        """Return the document cached under key, if any."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return copy(entry[0]) if self.clone else entry[0]
+
+    def put(self, key: Hashable, size: int, doc: "BaseDIDDocument"):
+        """Cache a document, evicting least recently used entries as needed."""
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        self.discard(key)
+        self._entries[key] = (copy(doc) if self.clone else doc, size)
+        self.size += size
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self.size > self.max_bytes
+        ):
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size -= evicted
+
+    def discard(self, key: Hashable):
+        """Remove the entry cached under key, if any."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries.clear()
+        self.size = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached documents."""
+        return len(self._entries)
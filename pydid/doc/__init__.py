@@ -6,6 +6,8 @@ from .builder import (
     ServiceBuilder,
     VerificationMethodBuilder,
 )
+from .collection import DIDDocumentCollection, KeyResolution
+from .diff import DocumentDiff, SectionDiff, diff_documents, patch_document
 from .doc import (
     BasicDIDDocument,
     DIDDocument,
@@ -13,12 +15,19 @@ from .doc import (
     DIDDocumentRoot,
     IdentifiedResourceMismatch,
     IDNotFoundError,
+    SalvageDiagnostic,
 )
+from .query import DIDCommEndpoint, DocumentQueryIndex, ResolvedRelationship
+from .template import DocumentTemplate
 
 __all__ = [
     "DIDDocumentError",
     "IdentifiedResourceMismatch",
     "IDNotFoundError",
+    "SalvageDiagnostic",
+    "DocumentQueryIndex",
+    "DIDCommEndpoint",
+    "ResolvedRelationship",
     "DIDDocumentRoot",
     "BasicDIDDocument",
     "DIDDocument",
@@ -26,4 +35,11 @@ __all__ = [
     "RelationshipBuilder",
     "ServiceBuilder",
     "DIDDocumentBuilder",
+    "DocumentDiff",
+    "SectionDiff",
+    "diff_documents",
+    "patch_document",
+    "DocumentTemplate",
+    "DIDDocumentCollection",
+    "KeyResolution",
 ]
@@ -1,6 +1,20 @@
 """DID Document and resource builders."""
 
-from typing import Iterator, List, Optional, Type, Union
+from collections import Counter
+from collections.abc import MutableSequence
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 from ..did import DID
 from ..did_url import DIDUrl
@@ -12,7 +26,314 @@ from ..service import (
 )
 from ..verification_method import VerificationMethod
 import warnings
-from .doc import DIDDocument
+from ..resource import Resource
+from .doc import (
+    RELATIONSHIPS,
+    DIDDocument,
+    IdentifiedResourceMismatch,
+    IDNotFoundError,
+)
+
+
+def _rows(count: int, columns: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Return keyword dicts from columns of values, one value per row."""
+    for name, column in columns.items():
+        if len(column) != count:
+            raise ValueError(
+                "Expected {} values for {}, got {}".format(count, name, len(column))
+            )
+    return [
+        {name: column[index] for name, column in columns.items()}
+        for index in range(count)
+    ]
+
+
+# Marker left in place of removed items until items are compacted
+_REMOVED = object()
+
+
+class IndexedItems:
+    """Ordered builder items indexed by id.
+
+    Items are methods, services, or references, keyed by their absolute id.
+    Appending, finding, and removing items by value or by id, and access by
+    position, take amortized constant time. Removed items leave a marker
+    behind, which is dropped on the next access by position. Supports the
+    list operations used on builder items; inserting, replacing slices, and
+    reordering take linear time, as for lists.
+
+    With copy_on_write, items must be a list, which is read in place until
+    items are first modified or looked up; only then are they copied and
+    indexed. Until then, source holds that list.
+    """
+
+    def __init__(self, did: DID, items: Iterable[Any] = (), copy_on_write: bool = False):
+        """Initialize items."""
+        self._did = did
+        self._items: List[Any] = []
+        self._by_key: Dict[str, Dict[int, None]] = {}
+        self._removed = 0
+        self._resources = 0
+        self.version = 0
+        self.source: Optional[list] = None
+        if copy_on_write:
+            self.source = items
+        else:
+            self.extend(items)
+
+    def _materialize(self):
+        """Copy and index items shared with their source."""
+        if self.source is not None:
+            source, self.source = self.source, None
+            self._reset(source)
+
+    def _reset(self, items: Iterable[Any]):
+        """Replace items, indexing them again."""
+        self._items = []
+        self._by_key = {}
+        self._removed = 0
+        self._resources = 0
+        for item in items:
+            self._add(len(self._items), item)
+            self._items.append(item)
+
+    def _replace(self, items: Iterable[Any]):
+        """Replace items after a change to their order or membership.
+
+        Items must have been read before, as a view stops reading its source.
+        """
+        self.source = None
+        self._reset(items)
+        self.version += 1
+
+    def _compact(self):
+        """Drop markers of removed items so positions are list positions."""
+        self._materialize()
+        if self._removed:
+            self._reset([item for item in self._items if item is not _REMOVED])
+
+    def _add(self, position: int, item: Any):
+        """Index item at position."""
+        self._by_key.setdefault(self.key(item), {})[position] = None
+        if not isinstance(item, str):
+            self._resources += 1
+
+    def _discard(self, position: int, item: Any):
+        """Remove item at position from the index."""
+        key = self.key(item)
+        del self._by_key[key][position]
+        if not self._by_key[key]:
+            del self._by_key[key]
+        if not isinstance(item, str):
+            self._resources -= 1
+
+    def _position(self, index: int) -> int:
+        """Return the position of a list index, which may be negative."""
+        self._compact()
+        if not -len(self._items) <= index < len(self._items):
+            raise IndexError("list index out of range")
+        return index % len(self._items)
+
+    @property
+    def resources(self) -> int:
+        """Return the number of items that are not references."""
+        if self.source is not None:
+            return sum(1 for item in self.source if not isinstance(item, str))
+        return self._resources
+
+    def key(self, item: Any) -> str:
+        """Return the absolute id of an item, reference, or id."""
+        ident = item if isinstance(item, str) else getattr(item, "id", item)
+        if isinstance(ident, DIDUrl):
+            return str(ident if ident.did else ident.as_absolute(self._did))
+        if isinstance(ident, str) and ident.startswith(("#", "?", "/")):
+            return str(self._did) + ident
+        return str(ident)
+
+    def append(self, item: Any):
+        """Append item."""
+        self._materialize()
+        self._add(len(self._items), item)
+        self._items.append(item)
+        self.version += 1
+
+    def extend(self, items: Iterable[Any]):
+        """Append items."""
+        for item in items:
+            self.append(item)
+
+    def __iadd__(self, items: Iterable[Any]) -> "IndexedItems":
+        """Append items."""
+        self.extend(items)
+        return self
+
+    def insert(self, index: int, item: Any):
+        """Insert item before index."""
+        items = list(self)
+        items.insert(index, item)
+        self._replace(items)
+
+    def _find(self, item: Any) -> Optional[int]:
+        """Return the position of the first item equal to item or with its id."""
+        self._materialize()
+        # Positions of a key are few but not kept in order
+        positions = sorted(self._by_key.get(self.key(item), {}))
+        for position in positions:
+            if self._items[position] == item:
+                return position
+        if isinstance(item, str) and positions:
+            return positions[0]
+        return None
+
+    def _pop_position(self, position: int) -> Any:
+        """Remove and return the item at position."""
+        removed = self._items[position]
+        self._discard(position, removed)
+        if position == len(self._items) - 1:
+            self._items.pop()
+        else:
+            self._items[position] = _REMOVED
+            self._removed += 1
+            if self._removed > len(self._items) // 2:
+                self._compact()
+        self.version += 1
+        return removed
+
+    def remove(self, item: Any) -> Any:
+        """Remove and return the first item equal to item, or with id item."""
+        position = self._find(item)
+        if position is None:
+            raise ValueError("{} not found".format(item))
+        return self._pop_position(position)
+
+    def pop(self, index: int = -1) -> Any:
+        """Remove and return the item at index."""
+        return self._pop_position(self._position(index))
+
+    def index(self, item: Any) -> int:
+        """Return the index of the first item equal to item, or with id item."""
+        self._compact()
+        position = self._find(item)
+        if position is None:
+            raise ValueError("{} not found".format(item))
+        return position
+
+    def clear(self):
+        """Remove all items."""
+        self._replace([])
+
+    def get(self, ident: Union[str, DIDUrl]) -> Optional[Any]:
+        """Return the first item with id ident."""
+        self._materialize()
+        positions = self._by_key.get(self.key(ident))
+        return self._items[min(positions)] if positions else None
+
+    def __contains__(self, item: Any) -> bool:
+        """Return whether item or an item with id item is present."""
+        return self._find(item) is not None
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over items in order."""
+        if self.source is not None:
+            return iter(self.source)
+        if self._removed:
+            return (item for item in self._items if item is not _REMOVED)
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        """Return number of items."""
+        if self.source is not None:
+            return len(self.source)
+        return len(self._items) - self._removed
+
+    def __getitem__(self, index):
+        """Return item or slice of items by position."""
+        if self.source is not None:
+            return self.source[index]
+        self._compact()
+        return self._items[index]
+
+    def __setitem__(self, index, value):
+        """Replace item or slice of items by position."""
+        if isinstance(index, slice):
+            items = list(self)
+            items[index] = value
+            self._replace(items)
+            return
+        position = self._position(index)
+        self._discard(position, self._items[position])
+        self._add(position, value)
+        self._items[position] = value
+        self.version += 1
+
+    def __delitem__(self, index):
+        """Delete item or slice of items by position."""
+        if isinstance(index, slice):
+            items = list(self)
+            del items[index]
+            self._replace(items)
+        else:
+            self.pop(index)
+
+    def count(self, item: Any) -> int:
+        """Return number of items equal to item."""
+        self._materialize()
+        positions = self._by_key.get(self.key(item), {})
+        return sum(1 for position in positions if self._items[position] == item)
+
+    def sort(self, *args, **kwargs):
+        """Sort items in place."""
+        items = list(self)
+        items.sort(*args, **kwargs)
+        self._replace(items)
+
+    def reverse(self):
+        """Reverse items in place."""
+        self._replace(list(self)[::-1])
+
+    def __reversed__(self) -> Iterator[Any]:
+        """Iterate over items in reverse order."""
+        return reversed(list(self))
+
+    def copy(self) -> List[Any]:
+        """Return items as a plain list."""
+        return list(self)
+
+    def __add__(self, other: Iterable[Any]) -> List[Any]:
+        """Return items followed by other as a plain list."""
+        if not isinstance(other, (IndexedItems, list)):
+            return NotImplemented
+        return list(self) + list(other)
+
+    def __radd__(self, other: Iterable[Any]) -> List[Any]:
+        """Return other followed by items as a plain list."""
+        if not isinstance(other, list):
+            return NotImplemented
+        return other + list(self)
+
+    def __mul__(self, count: int) -> List[Any]:
+        """Return items repeated as a plain list."""
+        return list(self) * count
+
+    __rmul__ = __mul__
+
+    def __imul__(self, count: int) -> "IndexedItems":
+        """Repeat items in place."""
+        self._replace(list(self) * count)
+        return self
+
+    def __eq__(self, other: Any) -> bool:
+        """Compare items in order."""
+        if isinstance(other, (IndexedItems, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        """Return representation of items."""
+        return "IndexedItems({!r})".format(list(self))
+
+
+MutableSequence.register(IndexedItems)
 
 
 def _default_id_generator(base: str, start: int = 0) -> Iterator[str]:
@@ -39,10 +360,29 @@ class VerificationMethodBuilder:
         self._id_base = id_base or "key"
         self._id_generator = self._default_id_generator()
 
+    @property
+    def methods(self) -> IndexedItems:
+        """Return methods of builder."""
+        return self._methods
+
+    @methods.setter
+    def methods(self, methods: Iterable[Any]):
+        """Set methods of builder."""
+        if not isinstance(methods, IndexedItems):
+            methods = IndexedItems(self._did, methods)
+        self._methods = methods
+
     def _default_id_generator(self):
         """Default ID generator."""
         yield from _default_id_generator(self._id_base, start=len(self.methods))
 
+    def _next_ident(self, reserved: Collection[DIDUrl] = ()) -> str:
+        """Return the next generated ID fragment not in use or reserved."""
+        ident = next(self._id_generator)
+        while self._did.ref(ident) in self.methods or self._did.ref(ident) in reserved:
+            ident = next(self._id_generator)
+        return ident
+
     def add(
         self,
         type_: Type[VerificationMethod],
@@ -51,14 +391,57 @@ class VerificationMethodBuilder:
         **kwargs,
     ):
         """Add verification method from parts and context."""
-        ident = ident or next(self._id_generator)
+        ident = ident or self._next_ident()
         controller = controller or self._did
         vmethod = type_.make(id=self._did.ref(ident), controller=controller, **kwargs)
         self.methods.append(vmethod)
         return vmethod
 
-    def remove(self, vmethod: VerificationMethod):
-        """Remove method from builder."""
+    def add_many(
+        self,
+        type_: Union[Type[VerificationMethod], Sequence[Type[VerificationMethod]]],
+        idents: Optional[Sequence[Optional[str]]] = None,
+        controller: DID = None,
+        **columns: Sequence[Any],
+    ) -> List[VerificationMethod]:
+        """Add verification methods from columns of values.
+
+        Each keyword argument is a list holding a value for each method, e.g.
+        public_key_base58=[...]. Type may be a single class for every method or
+        a list of classes. Methods of each class are validated in one batch and
+        none are added if any fails validation.
+        """
+        types = type_ if isinstance(type_, Sequence) else None
+        count = next(
+            (
+                len(column)
+                for column in (types, idents, *columns.values())
+                if column is not None
+            ),
+            0,
+        )
+        types = types if types is not None else [type_] * count
+        idents = idents if idents is not None else [None] * count
+        rows = _rows(count, {"type_": types, "ident": idents, **columns})
+
+        controller = controller or self._did
+        reserved = {self._did.ref(ident) for ident in idents if ident}
+        batches: Dict[Type[VerificationMethod], List[int]] = {}
+        for index, row in enumerate(rows):
+            row["id"] = self._did.ref(row.pop("ident") or self._next_ident(reserved))
+            row["controller"] = controller
+            batches.setdefault(row.pop("type_"), []).append(index)
+
+        vmethods: List[Any] = [None] * count
+        for cls, indices in batches.items():
+            made = cls.make_many(rows[index] for index in indices)
+            for index, vmethod in zip(indices, made):
+                vmethods[index] = vmethod
+        self.methods.extend(vmethods)
+        return vmethods
+
+    def remove(self, vmethod: Union[VerificationMethod, DIDUrl, str]):
+        """Remove method, or method with the given id, from builder."""
         self.methods.remove(vmethod)
 
 
@@ -78,14 +461,7 @@ class RelationshipBuilder(VerificationMethodBuilder):
 
     def _default_id_generator(self):
         """Default ID generator."""
-        start = len(
-            [
-                vmethod
-                for vmethod in self.methods
-                if isinstance(vmethod, VerificationMethod)
-            ]
-        )
-        yield from _default_id_generator(self._id_base, start=start)
+        yield from _default_id_generator(self._id_base, start=self.methods.resources)
 
     def reference(self, ref: DIDUrl):
         """Add reference to relationship."""
@@ -101,7 +477,10 @@ class RelationshipBuilder(VerificationMethodBuilder):
         return super().add(*args, **kwargs)
 
     def remove(self, vmethod: Union[DIDUrl, VerificationMethod]):
-        """Remove reference or method from builder."""
+        """Remove reference or method from builder.
+
+        A reference matching no reference removes the method with that id.
+        """
         self.methods.remove(vmethod)
 
 
@@ -114,35 +493,104 @@ class ServiceBuilder:
         self.services = services or []
         self._id_generator = _default_id_generator("service", start=len(self.services))
 
+    @property
+    def services(self) -> IndexedItems:
+        """Return services of builder."""
+        return self._services
+
+    @services.setter
+    def services(self, services: Iterable[Service]):
+        """Set services of builder."""
+        if not isinstance(services, IndexedItems):
+            services = IndexedItems(self._did, services)
+        self._services = services
+        self._priorities_version = None
+        self._count_priorities()
+
+    def _count_priorities(self):
+        """Count the priorities of DIDComm V1 services, if services changed.
+
+        Services changed other than through this builder are counted again.
+        """
+        if self._priorities_version == self.services.version:
+            return
+        self._priorities = Counter(
+            service.priority
+            for service in self.services
+            if isinstance(service, DIDCommV1Service)
+        )
+        self._max_priority = max(self._priorities, default=None)
+        self._priorities_version = self.services.version
+
+    def _next_ident(self, reserved: Collection[DIDUrl] = ()) -> str:
+        """Return the next generated ID fragment not in use or reserved."""
+        ident = next(self._id_generator)
+        while self._did.ref(ident) in self.services or self._did.ref(ident) in reserved:
+            ident = next(self._id_generator)
+        return ident
+
+    def _append(self, service: Service):
+        """Append service, tracking the priorities of DIDComm V1 services."""
+        self._count_priorities()
+        self.services.append(service)
+        self._priorities_version = self.services.version
+        if isinstance(service, DIDCommV1Service):
+            self._priorities[service.priority] += 1
+            if self._max_priority is None or service.priority > self._max_priority:
+                self._max_priority = service.priority
+
     def _determine_next_priority(self):
         """Return the next priority after the highest priority currently in services."""
-        return (
-            max(
-                [
-                    service.priority
-                    for service in self.services
-                    if isinstance(service, DIDCommV1Service)
-                ]
-            )
-            + 1
-            if self.services
-            else 0
-        )
+        self._count_priorities()
+        return self._max_priority + 1 if self._max_priority is not None else 0
 
     def add(
         self, type_: str, service_endpoint: str, ident: Optional[str] = None, **extra
     ):
         """Add service."""
-        ident = ident or next(self._id_generator)
+        ident = ident or self._next_ident()
         service = Service.make(
             id=self._did.ref(ident),
             type=type_,
             service_endpoint=service_endpoint,
             **extra,
         )
-        self.services.append(service)
+        self._append(service)
         return service
 
+    def add_many(
+        self,
+        type_: Union[str, Sequence[str]],
+        service_endpoints: Sequence[Any],
+        idents: Optional[Sequence[Optional[str]]] = None,
+        **columns: Sequence[Any],
+    ) -> List[Service]:
+        """Add services from columns of values, validated in one batch.
+
+        Type may be a single type for every service or a list of types. Each
+        keyword argument is a list holding a value for each service. No services
+        are added if any fails validation.
+        """
+        count = len(service_endpoints)
+        types = [type_] * count if isinstance(type_, str) else type_
+        idents = idents if idents is not None else [None] * count
+        rows = _rows(
+            count,
+            {
+                "type": types,
+                "service_endpoint": service_endpoints,
+                "ident": idents,
+                **columns,
+            },
+        )
+        reserved = {self._did.ref(ident) for ident in idents if ident}
+        for row in rows:
+            row["id"] = self._did.ref(row.pop("ident") or self._next_ident(reserved))
+        services = Service.make_many(rows)
+        for service in services:
+            self._append(service)
+        return services
+
     def add_didcomm_v1(
         self,
         service_endpoint: str,
@@ -155,7 +603,7 @@ class ServiceBuilder:
         accept: Optional[List[str]] = None,
     ):
         """Add DIDComm V1 (did-communication) service."""
-        ident = ident or next(self._id_generator)
+        ident = ident or self._next_ident()
         routing_keys = routing_keys or []
         priority = priority or self._determine_next_priority()
 
@@ -178,7 +626,7 @@ class ServiceBuilder:
             priority=priority,
             accept=accept,
         )
-        self.services.append(service)
+        self._append(service)
         return service
 
     def add_didcomm_v2(
@@ -192,7 +640,7 @@ class ServiceBuilder:
         accept: Optional[List[str]] = None,
     ):
         """Add DIDComm V2 (DIDCommMessaging) service."""
-        ident = ident or next(self._id_generator)
+        ident = ident or self._next_ident()
         routing_keys = routing_keys or []
 
         routing_key_ids = [
@@ -207,7 +655,7 @@ class ServiceBuilder:
         service = DIDCommV2Service.make(
             id=self._did.ref(ident), service_endpoint=endpoint, type=svc_type
         )
-        self.services.append(service)
+        self._append(service)
         return service
 
     def add_didcomm(
@@ -267,9 +715,17 @@ class ServiceBuilder:
         else:
             raise NotImplementedError(f"DIDComm version {version} not supported.")
 
-    def remove(self, service: Service):
-        """Remove service from builder."""
-        self.services.remove(service)
+    def remove(self, service: Union[Service, DIDUrl, str]):
+        """Remove service, or service with the given id, from builder."""
+        self._count_priorities()
+        service = self.services.remove(service)
+        self._priorities_version = self.services.version
+        if isinstance(service, DIDCommV1Service):
+            self._priorities[service.priority] -= 1
+            if not self._priorities[service.priority]:
+                del self._priorities[service.priority]
+                if service.priority == self._max_priority:
+                    self._max_priority = max(self._priorities, default=None)
 
 
 class DIDDocumentBuilder:
@@ -296,6 +752,8 @@ class DIDDocumentBuilder:
         self.capability_delegation = RelationshipBuilder(self.id, "capability-delegation")
         self.service = ServiceBuilder(self.id)
         self.extra = {}
+        self._source: Optional[DIDDocument] = None
+        self._validated: Dict[int, Tuple[Resource, int]] = {}
 
     @staticmethod
     def __default_context() -> List[str]:
@@ -303,47 +761,145 @@ class DIDDocumentBuilder:
 
     @classmethod
     def from_doc(cls, doc: DIDDocument) -> "DIDDocumentBuilder":
-        """Create a Builder from an existing DIDDocument."""
+        """Create a Builder from an existing DIDDocument.
+
+        The document is not modified by the builder. Its sections are shared
+        with the builder and copied only when modified through the builder;
+        until then, they reflect changes made to the document.
+        """
         builder = cls(
             id=doc.id,
             context=doc.context,
             also_known_as=doc.also_known_as,
             controller=doc.controller,
         )
+
+        def view(name: str) -> Optional[IndexedItems]:
+            items = getattr(doc, name)
+            if items is None:
+                return None
+            return IndexedItems(doc.id, items, copy_on_write=True)
+
         builder.verification_method = VerificationMethodBuilder(
-            doc.id, methods=doc.verification_method
+            doc.id, methods=view("verification_method")
         )
         builder.authentication = RelationshipBuilder(
-            doc.id, "auth", methods=doc.authentication
+            doc.id, "auth", methods=view("authentication")
         )
         builder.assertion_method = RelationshipBuilder(
-            doc.id, "assert", methods=doc.assertion_method
+            doc.id, "assert", methods=view("assertion_method")
         )
         builder.key_agreement = RelationshipBuilder(
-            doc.id, "key-agreement", methods=doc.key_agreement
+            doc.id, "key-agreement", methods=view("key_agreement")
         )
         builder.capability_invocation = RelationshipBuilder(
-            doc.id, "capability-invocation", methods=doc.capability_invocation
+            doc.id, "capability-invocation", methods=view("capability_invocation")
         )
         builder.capability_delegation = RelationshipBuilder(
-            doc.id, "capability-delegation", methods=doc.capability_delegation
+            doc.id, "capability-delegation", methods=view("capability_delegation")
         )
-        builder.service = ServiceBuilder(doc.id, services=doc.service)
+        builder.service = ServiceBuilder(doc.id, services=view("service"))
+        builder._source = doc
         return builder
 
-    def build(self) -> DIDDocument:
-        """Build document."""
-        return DIDDocument.model_construct(
+    def _sections(self) -> Dict[str, IndexedItems]:
+        """Return the items of each document section."""
+        return {
+            "verification_method": self.verification_method.methods,
+            "authentication": self.authentication.methods,
+            "assertion_method": self.assertion_method.methods,
+            "key_agreement": self.key_agreement.methods,
+            "capability_invocation": self.capability_invocation.methods,
+            "capability_delegation": self.capability_delegation.methods,
+            "service": self.service.services,
+        }
+
+    def _reuse_index(self, doc: DIDDocument, sections: Dict[str, IndexedItems]):
+        """Index doc from the index of the source document.
+
+        Entries of sections unchanged since from_doc are reused; only the
+        sections modified through the builder are reindexed.
+        """
+        source = self._source
+        if source is None or not source._indexed or source.id != doc.id:
+            return
+        doc._index = dict(source._index)
+        doc._index_refs = dict(source._index_refs)
+        try:
+            for name, items in sections.items():
+                if items.source is None or items.source is not source.__dict__[name]:
+                    doc._unindex_items(getattr(source, name) or [])
+                    doc._index_items(getattr(doc, name) or [])
+        except IdentifiedResourceMismatch:
+            # Leave indexing, and reporting the mismatch, to first dereference
+            doc._index = {}
+            doc._index_refs = {}
+            return
+        doc._indexed = True
+
+    def _validate_items(self, sections: Dict[str, IndexedItems]):
+        """Validate resources added or changed since the last validated build.
+
+        Resources are recorded with their version, which is bumped when an
+        attribute is assigned; changes made in place to nested values are not
+        detected.
+        """
+        validated = {}
+        for items in sections.values():
+            for item in items:
+                if not isinstance(item, Resource):
+                    continue
+                if self._validated.get(id(item)) != (item, item._version):
+                    type(item).deserialize(item.serialize())
+                validated[id(item)] = (item, item._version)
+        self._validated = validated
+
+    @staticmethod
+    def _check_references(doc: DIDDocument):
+        """Raise if references to methods of doc do not resolve."""
+        doc.build_index()
+        references = [
+            item
+            for name in RELATIONSHIPS
+            for item in getattr(doc, name) or []
+            if isinstance(item, DIDUrl)
+        ]
+        for service in doc.service or []:
+            references.extend(service.key_references())
+
+        missing = []
+        for ref in references:
+            absolute = ref if ref.did else ref.as_absolute(doc.id)
+            if absolute.did != doc.id:
+                continue
+            if not isinstance(doc._index.get(absolute), VerificationMethod):
+                missing.append(absolute)
+        if missing:
+            raise IDNotFoundError(
+                "References not found in document: {}".format(
+                    ", ".join(dict.fromkeys(missing))
+                )
+            )
+
+    def build(self, validate: bool = False) -> DIDDocument:
+        """Build document.
+
+        With validate, methods and services added or changed since the last
+        validated build are validated, and references from relationships and
+        services to methods of this document are checked against its index.
+        """
+        sections = self._sections()
+        if validate:
+            self._validate_items(sections)
+        doc = DIDDocument.model_construct(
             id=self.id,
             context=self.context,
             also_known_as=self.also_known_as,
             controller=self.controller,
-            verification_method=self.verification_method.methods or None,
-            authentication=self.authentication.methods or None,
-            assertion_method=self.assertion_method.methods or None,
-            key_agreement=self.key_agreement.methods or None,
-            capability_invocation=self.capability_invocation.methods or None,
-            capability_delegation=self.capability_delegation.methods or None,
-            service=self.service.services or None,
+            **{name: list(items) or None for name, items in sections.items()},
             **self.extra,
         )
+        self._reuse_index(doc, sections)
+        if validate:
+            self._check_references(doc)
+        return doc
@@ -0,0 +1,133 @@
+"""Collections of DID Documents resolving references across documents."""
+
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from ..did import DID
+from ..did_url import DIDUrl, InvalidDIDUrlError
+from ..service import Service
+from ..verification_method import VerificationMethod
+from .doc import BasicDIDDocument, IDNotFoundError
+
+
+class KeyResolution(NamedTuple):
+    """Result of resolving key references across a collection.
+
+    Resolved maps each resolved reference, in absolute form, to its method.
+    Unresolved lists the references that could not be resolved, either as
+    given, for invalid references, or in absolute form.
+    """
+
+    resolved: Dict[DIDUrl, VerificationMethod]
+    unresolved: List[Union[DIDUrl, str]]
+
+    @property
+    def materials(self) -> Dict[DIDUrl, Any]:
+        """Return the verification material of each resolved reference."""
+        return {ref: vmethod.material for ref, vmethod in self.resolved.items()}
+
+    def raise_for_unresolved(self):
+        """Raise IDNotFoundError listing every unresolved reference."""
+        if self.unresolved:
+            raise IDNotFoundError(
+                "Unresolved key references: {}".format(", ".join(self.unresolved))
+            )
+
+
+class DIDDocumentCollection:
+    """Set of documents resolving key references in bulk.
+
+    Documents are indexed by DID; each document's own index of resources is
+    then used to resolve references within it. Both are dictionary lookups, so
+    resolving a reference does not depend on the number of documents, and
+    changes to member documents are reflected without rebuilding the
+    collection.
+    """
+
+    def __init__(self, docs: Iterable[BasicDIDDocument] = ()):
+        """Initialize collection."""
+        self._docs: Dict[str, BasicDIDDocument] = {}
+        for doc in docs:
+            self.add(doc)
+
+    def add(self, doc: BasicDIDDocument):
+        """Add or replace the document for a DID."""
+        self._docs[str(doc.id)] = doc.build_index()
+
+    def remove(self, did: Union[str, DID]):
+        """Remove the document for a DID."""
+        del self._docs[str(did)]
+
+    def get(self, did: Union[str, DID]) -> Optional[BasicDIDDocument]:
+        """Return the document for a DID, if present."""
+        return self._docs.get(str(did))
+
+    def __contains__(self, did: Union[str, DID]) -> bool:
+        """Return whether the collection holds a document for a DID."""
+        return str(did) in self._docs
+
+    def __iter__(self) -> Iterator[BasicDIDDocument]:
+        """Iterate over documents."""
+        return iter(self._docs.values())
+
+    def __len__(self) -> int:
+        """Return number of documents."""
+        return len(self._docs)
+
+    def _lookup(self, ref: DIDUrl) -> Optional[VerificationMethod]:
+        """Return the method ref points to, if held by the collection."""
+        doc = self._docs.get(ref.did)
+        if doc is None:
+            return None
+        vmethod = doc._index.get(ref)
+        return vmethod if isinstance(vmethod, VerificationMethod) else None
+
+    def resolve(
+        self,
+        refs: Iterable[Union[str, DIDUrl]],
+        base: Union[str, DID, None] = None,
+    ) -> KeyResolution:
+        """Resolve key references to verification methods.
+
+        Relative references are made absolute against base, typically the DID
+        of the document they were found in. Every reference is attempted and
+        those that cannot be resolved are reported together.
+        """
+        resolved: Dict[DIDUrl, VerificationMethod] = {}
+        unresolved: List[Union[DIDUrl, str]] = []
+        seen = set()
+        base = DID(base) if base is not None else None
+        for ref in refs:
+            try:
+                url = ref if isinstance(ref, DIDUrl) else DIDUrl.parse(ref)
+            except InvalidDIDUrlError:
+                unresolved.append(ref)
+                continue
+            if url.did is None:
+                if base is None:
+                    unresolved.append(url)
+                    continue
+                url = url.as_absolute(base)
+            if url in seen:
+                continue
+            seen.add(url)
+            vmethod = self._lookup(url)
+            if vmethod is None:
+                unresolved.append(url)
+            else:
+                resolved[url] = vmethod
+        return KeyResolution(resolved, unresolved)
+
+    def resolve_services(
+        self, doc: BasicDIDDocument, services: Optional[Iterable[Service]] = None
+    ) -> KeyResolution:
+        """Resolve the key references of the services of doc, or of services."""
+        services = (doc.service or []) if services is None else services
+        return self.resolve(
+            (
+                ref
+                for service in services
+                if isinstance(service, Service)
+                for ref in service.key_references()
+            ),
+            base=doc.id,
+        )
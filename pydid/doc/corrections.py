@@ -1,11 +1,296 @@
-"""Common DID Document corrections."""
+"""Common DID Document corrections.
 
-from typing import Union
+Corrections are callables taking and returning a raw document dictionary.
+Corrections derived from Correction declare the keys and kinds of node they act
+on, allowing a CorrectionPipeline to apply several of them in one traversal of
+the document. Plain callables remain supported and are applied on their own.
+"""
+
+from copy import deepcopy
+from itertools import count
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Union,
+)
 
 from ..did import DID
+from ..validation import _EXHAUSTED
+
+
+class Correction:
+    """Base class for corrections applied as part of a single traversal.
+
+    Hooks are pure: they return a corrected node, or the node itself when no
+    correction is needed, and leave the node they are given untouched.
+
+    The document hook is applied to the document as a whole. The member hook
+    is applied to each dictionary found in the value of a top level key of the
+    document, descending into nested lists. Keys limits the top level keys
+    whose members are visited; None visits every key.
+
+    A correction is skipped for documents missing all of its trigger keys,
+    for documents of DID methods other than its methods, and for documents
+    rejected by applies. Triggers and methods of None do not restrict it.
+    """
+
+    name: Optional[str] = None
+    keys: Optional[Collection[str]] = None
+    triggers: Optional[Collection[str]] = None
+    methods: Optional[Collection[str]] = None
+
+    def applies(self, document: dict) -> bool:
+        """Return whether this correction should be applied to document."""
+        return True
+
+    def prepare(self, document: dict) -> Any:
+        """Return state for a single application of this correction."""
+        return None
+
+    def correct_document(self, document: dict, state: Any) -> dict:
+        """Return the corrected document."""
+        return document
+
+    def correct_member(self, key: str, member: dict, state: Any) -> dict:
+        """Return the corrected member found under key."""
+        return member
+
+    @property
+    def corrects_document(self) -> bool:
+        """Return whether this correction defines a document hook."""
+        return type(self).correct_document is not Correction.correct_document
+
+    @property
+    def corrects_members(self) -> bool:
+        """Return whether this correction defines a member hook."""
+        return type(self).correct_member is not Correction.correct_member
+
+    def __call__(self, value: dict) -> dict:
+        """Apply this correction alone."""
+        return CorrectionPipeline([self])(value)
+
+
+def correction_name(correction: Callable) -> str:
+    """Return the name of a correction as reported by pipelines."""
+    if isinstance(correction, Correction):
+        return correction.name or type(correction).__name__
+    return getattr(correction, "__name__", repr(correction))
+
+
+def _did_method(document: dict) -> Optional[str]:
+    """Return the method of the document DID, if any."""
+    ident = document.get("id")
+    if not isinstance(ident, str):
+        return None
+    parts = ident.split(":", 2)
+    if len(parts) < 3 or parts[0] != "did":
+        return None
+    return parts[1]
+
+
+class CorrectionReport(NamedTuple):
+    """Corrected document and the names of the corrections that fired.
+
+    A Correction fires when one of its hooks returns a corrected node. Plain
+    callables are reported whenever they are applied.
+    """
+
+    document: dict
+    fired: List[str]
+
+
+class CorrectionPipeline:
+    """Apply a sequence of corrections to raw documents.
+
+    Consecutive Correction instances are fused: their document hooks are
+    applied in order, followed by a single traversal applying their member
+    hooks in order. A correction with a document hook following one with
+    member hooks starts a new group, so that results match applying the
+    corrections one at a time. Other callables are applied on their own,
+    between the fused groups around them.
 
+    Corrections are indexed by trigger key when the pipeline is created, so
+    corrections whose trigger keys are absent from a document are skipped
+    without being consulted.
 
-def insert_missing_ids(value: dict) -> dict:
+    By default, documents are corrected in place. With copy_on_write, the
+    document passed in is left untouched: only the containers on the path to a
+    corrected node are copied and everything else is shared with the input.
+    Plain callables may mutate their input, so in this mode each is given a
+    deep copy of the document.
+    """
+
+    def __init__(
+        self,
+        corrections: Optional[Iterable[Callable]] = None,
+        copy_on_write: bool = False,
+    ):
+        """Initialize pipeline."""
+        self.corrections = list(corrections or [])
+        self.copy_on_write = copy_on_write
+        self._groups: List[Union[int, List[int]]] = []
+        self._untriggered: Set[int] = set()
+        self._trigger_index: Dict[str, Set[int]] = {}
+        for position, correction in enumerate(self.corrections):
+            if not isinstance(correction, Correction):
+                self._groups.append(position)
+                continue
+            if self._fuses(correction):
+                self._groups[-1].append(position)
+            else:
+                self._groups.append([position])
+            if correction.triggers is None:
+                self._untriggered.add(position)
+            for key in correction.triggers or ():
+                self._trigger_index.setdefault(key, set()).add(position)
+
+    def _fuses(self, correction: Correction) -> bool:
+        """Return whether correction may join the last group."""
+        if not self._groups or not isinstance(self._groups[-1], list):
+            return False
+        return not correction.corrects_document or not any(
+            self.corrections[position].corrects_members for position in self._groups[-1]
+        )
+
+    def __call__(self, value: dict) -> dict:
+        """Apply corrections to value, returning the corrected document."""
+        return self.apply_with_report(value).document
+
+    def apply_with_report(self, value: dict) -> CorrectionReport:
+        """Apply corrections to value, reporting the corrections that fired."""
+        fired: Set[int] = set()
+        for group in self._groups:
+            if isinstance(group, list):
+                value = self._apply_fused(value, group, fired)
+                continue
+            correction = self.corrections[group]
+            value = correction(deepcopy(value) if self.copy_on_write else value)
+            fired.add(group)
+        return CorrectionReport(
+            value,
+            [correction_name(self.corrections[position]) for position in sorted(fired)],
+        )
+
+    def _triggered(self, document: dict) -> Set[int]:
+        """Return the positions of corrections triggered by document."""
+        triggered = set(self._untriggered)
+        for key, positions in self._trigger_index.items():
+            if key in document:
+                triggered |= positions
+        return triggered
+
+    def _select(self, group: List[int], document: dict):
+        """Apply document hooks of the selected corrections of a group.
+
+        Returns the document and the member hooks to apply with their state.
+        """
+        triggered = self._triggered(document)
+        method = _did_method(document)
+        hooks = []
+        fired = set()
+        for position in group:
+            correction = self.corrections[position]
+            if position not in triggered:
+                continue
+            if correction.methods is not None and method not in correction.methods:
+                continue
+            if not correction.applies(document):
+                continue
+            state = correction.prepare(document)
+            corrected = correction.correct_document(document, state)
+            if corrected is not document:
+                fired.add(position)
+                document = corrected
+                triggered = self._triggered(document)
+                method = _did_method(document)
+            if correction.corrects_members:
+                hooks.append((position, correction, state))
+        return document, hooks, fired
+
+    def _apply_fused(self, value: dict, group: List[int], fired: Set[int]) -> dict:
+        """Apply a group of corrections in a single traversal."""
+        document, hooks, document_fired = self._select(group, value)
+        fired |= document_fired
+        if hooks:
+            for key, nested in list(document.items()):
+                applicable = [
+                    hook for hook in hooks if hook[1].keys is None or key in hook[1].keys
+                ]
+                if not applicable:
+                    continue
+                corrected = self._correct_value(key, nested, applicable, fired)
+                if corrected is not nested:
+                    if document is value and self.copy_on_write:
+                        document = dict(value)
+                    document[key] = corrected
+
+        if document is not value and not self.copy_on_write:
+            value.clear()
+            value.update(document)
+            return value
+        return document
+
+    @staticmethod
+    def _correct_member(key: str, member: dict, hooks: list, fired: Set[int]) -> dict:
+        """Apply member hooks to a member."""
+        for position, correction, state in hooks:
+            corrected = correction.correct_member(key, member, state)
+            if corrected is not member:
+                fired.add(position)
+                member = corrected
+        return member
+
+    def _correct_value(self, key: str, value: Any, hooks: list, fired: Set[int]) -> Any:
+        """Apply member hooks to the members of a top level value.
+
+        Returns the corrected value, which is value itself if unchanged or if
+        correcting in place.
+        """
+        if isinstance(value, dict):
+            return self._correct_member(key, value, hooks, fired)
+        if not isinstance(value, list):
+            return value
+
+        # Walk nested lists depth first with an explicit stack of frames,
+        # each holding an iterator, its list, its copy if one was made, and the
+        # index of the current member
+        root = [value]
+        stack = [[iter(enumerate(root)), root, None, None]]
+        while stack:
+            frame = stack[-1]
+            index, nested = next(frame[0], (None, _EXHAUSTED))
+            if nested is _EXHAUSTED:
+                stack.pop()
+                if stack and frame[2] is not None:
+                    self._replace(stack[-1], stack[-1][3], frame[2])
+                continue
+            frame[3] = index
+            if isinstance(nested, list):
+                stack.append([iter(enumerate(nested)), nested, None, None])
+            elif isinstance(nested, dict):
+                corrected = self._correct_member(key, nested, hooks, fired)
+                if corrected is not nested:
+                    self._replace(frame, index, corrected)
+        return (frame[2] if frame[2] is not None else root)[0]
+
+    def _replace(self, frame: list, index: int, item: Any):
+        """Replace a member of the list of a frame, copying it if required."""
+        if not self.copy_on_write:
+            frame[1][index] = item
+            return
+        if frame[2] is None:
+            frame[2] = list(frame[1])
+        frame[2][index] = item
+
+
+class InsertMissingIds(Correction):
     """Insert missing resource IDs.
 
     This correction can be applied directly to a raw document dictionary or
@@ -22,33 +307,24 @@ def insert_missing_ids(value: dict) -> dict:
     ...     doc_raw, corrections=[pydid.corrections.insert_missing_ids]
     ... )
     """
-    if "id" not in value:
-        raise ValueError("No ID found in Document.")
 
-    did = DID(value["id"])
-    index = 0
+    name = "insert_missing_ids"
 
-    def _walk(value: Union[str, list, dict]):
-        nonlocal index
-        if isinstance(value, str):
-            return
-        if isinstance(value, list):
-            for item in value:
-                _walk(item)
-            return
-        if isinstance(value, dict):
-            if "id" not in value:
-                value["id"] = str(did.ref("inserted-{}".format(index)))
-                index += 1
-                return
-
-    for nested in value.values():
-        _walk(nested)
+    def prepare(self, document: dict):
+        """Return the document DID and a counter for inserted IDs."""
+        if "id" not in document:
+            raise ValueError("No ID found in Document.")
+        return DID(document["id"]), count()
 
-    return value
+    def correct_member(self, key: str, member: dict, state) -> dict:
+        """Return member with an ID inserted if missing."""
+        if "id" in member:
+            return member
+        did, counter = state
+        return {**member, "id": str(did.ref("inserted-{}".format(next(counter))))}
 
 
-def public_key_is_verification_method(value: dict) -> dict:
+class PublicKeyIsVerificationMethod(Correction):
     """Transform publicKey to verificationMethod.
 
     This is helpful if dealing with DID resolvers that have not updated to the
@@ -80,6 +356,17 @@ def public_key_is_verification_method(value: dict) -> dict:
     >>> assert doc.verification_method
     """
 
-    if "publicKey" in value:
-        value["verificationMethod"] = value.pop("publicKey")
-    return value
+    name = "public_key_is_verification_method"
+    triggers = ("publicKey",)
+
+    def correct_document(self, document: dict, state) -> dict:
+        """Return document with publicKey renamed to verificationMethod."""
+        if "publicKey" not in document:
+            return document
+        corrected = {key: value for key, value in document.items() if key != "publicKey"}
+        corrected["verificationMethod"] = document["publicKey"]
+        return corrected
+
+
+insert_missing_ids = InsertMissingIds()
+public_key_is_verification_method = PublicKeyIsVerificationMethod()
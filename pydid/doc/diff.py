@@ -0,0 +1,195 @@
+"""Structural diffs between versions of a DID Document."""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, TypeVar
+
+from ..did_url import DIDUrl
+from ..resource import Resource
+from .doc import SECTIONS, BasicDIDDocument
+
+DocumentType = TypeVar("DocumentType", bound=BasicDIDDocument)
+ItemKey = Tuple[str, str]
+
+
+class SectionDiff(NamedTuple):
+    """Changes to the members of a document section.
+
+    Members are keyed by kind ("resource" or "reference") and absolute id.
+    Sections with members lacking ids or sharing an id are instead keyed by
+    kind "index" and position. Order lists the keys of the new section in
+    order, or is None if the section is absent from the new document.
+    """
+
+    added: Dict[ItemKey, Any]
+    removed: List[ItemKey]
+    changed: Dict[ItemKey, Any]
+    order: Optional[List[ItemKey]]
+
+
+class DocumentDiff(NamedTuple):
+    """Changes between two versions of a document.
+
+    Fields maps the names of changed top level properties, including extra
+    properties, to their new values; removed_fields lists properties absent
+    from the new document. Sections maps the names of changed sections to
+    their SectionDiff. Unchanged sections are not included.
+    """
+
+    fields: Dict[str, Any]
+    removed_fields: List[str]
+    sections: Dict[str, SectionDiff]
+
+    @property
+    def is_empty(self) -> bool:
+        """Return whether the documents are equivalent."""
+        return not (self.fields or self.removed_fields or self.sections)
+
+    def changed_ids(self) -> Set[str]:
+        """Return the absolute ids of resources added, removed, or changed."""
+        ids = set()
+        for section in self.sections.values():
+            for kind, ident in (
+                list(section.added) + section.removed + list(section.changed)
+            ):
+                if kind == "resource":
+                    ids.add(ident)
+        return ids
+
+
+def _item_key(doc: BasicDIDDocument, item: Any) -> Optional[ItemKey]:
+    """Return the key of a section member, if it can be keyed."""
+    if isinstance(item, DIDUrl):
+        return ("reference", doc._index_keys(item)[0])
+    if isinstance(item, Resource) and isinstance(getattr(item, "id", None), DIDUrl):
+        return ("resource", doc._index_keys(item.id)[0])
+    return None
+
+
+def _keyed(doc: BasicDIDDocument, items: List[Any]) -> Optional[Dict[ItemKey, Any]]:
+    """Return members by key, or None if members cannot be uniquely keyed."""
+    keyed = {}
+    for item in items:
+        key = _item_key(doc, item)
+        if key is None or key in keyed:
+            return None
+        keyed[key] = item
+    return keyed
+
+
+def _positional(items: List[Any]) -> Dict[ItemKey, Any]:
+    """Return members keyed by position."""
+    return {("index", str(index)): item for index, item in enumerate(items)}
+
+
+def _diff_section(
+    old: BasicDIDDocument, new: BasicDIDDocument, name: str
+) -> Optional[SectionDiff]:
+    """Return the diff of a section, or None if unchanged."""
+    old_items = getattr(old, name)
+    new_items = getattr(new, name)
+    if old_items is None and new_items is None:
+        return None
+
+    old_keyed = _keyed(old, old_items or [])
+    new_keyed = _keyed(new, new_items or [])
+    if old_keyed is None or new_keyed is None:
+        # Members without ids or sharing ids are matched by position
+        old_keyed = _positional(old_items or [])
+        new_keyed = _positional(new_items or [])
+
+    added = {}
+    changed = {}
+    for key, item in new_keyed.items():
+        if key not in old_keyed:
+            added[key] = item
+        elif old_keyed[key] is not item and old_keyed[key] != item:
+            changed[key] = item
+    removed = [key for key in old_keyed if key not in new_keyed]
+    order = list(new_keyed) if new_items is not None else None
+
+    if (
+        not (added or changed or removed)
+        and (old_items is None) == (new_items is None)
+        and list(old_keyed) == order
+    ):
+        return None
+    return SectionDiff(added, removed, changed, order)
+
+
+def _top_level(doc: BasicDIDDocument) -> Dict[str, Any]:
+    """Return the top level properties of a document other than sections."""
+    props = {
+        name: getattr(doc, name)
+        for name in type(doc).model_fields
+        if name not in SECTIONS
+    }
+    props.update(doc.model_extra or {})
+    return props
+
+
+def diff_documents(old: BasicDIDDocument, new: BasicDIDDocument) -> DocumentDiff:
+    """Return the structural diff from old to new.
+
+    Section members are matched by id, so reordering, adding, removing, or
+    changing a single method or service is described by that member alone.
+    """
+    old_props = _top_level(old)
+    new_props = _top_level(new)
+    fields = {
+        name: value
+        for name, value in new_props.items()
+        if name not in old_props or old_props[name] != value
+    }
+    removed_fields = [name for name in old_props if name not in new_props]
+
+    sections = {}
+    for name in SECTIONS:
+        section = _diff_section(old, new, name)
+        if section is not None:
+            sections[name] = section
+
+    return DocumentDiff(fields, removed_fields, sections)
+
+
+def _patch_section(doc: BasicDIDDocument, name: str, diff: SectionDiff):
+    """Return the members of a section after applying diff."""
+    if diff.order is None:
+        return None
+
+    current = getattr(doc, name) or []
+    keys = diff.order + diff.removed + list(diff.changed)
+    if any(kind == "index" for kind, _ in keys):
+        keyed = _positional(current)
+    else:
+        keyed = _keyed(doc, current)
+        if keyed is None:
+            raise ValueError("Members of {} cannot be matched by id".format(name))
+    for key in diff.removed:
+        if keyed.pop(key, None) is None:
+            raise ValueError("{} not found in {}".format(key[1], name))
+    for key, item in diff.changed.items():
+        if key not in keyed:
+            raise ValueError("{} not found in {}".format(key[1], name))
+        keyed[key] = item
+    keyed.update(diff.added)
+    return [keyed[key] for key in diff.order]
+
+
+def patch_document(doc: DocumentType, diff: DocumentDiff) -> DocumentType:
+    """Return a new document with diff applied to doc.
+
+    Unchanged members and sections are reused from doc rather than copied;
+    doc itself is not modified. The result is not revalidated.
+    """
+    values = _top_level(doc)
+    for name in diff.removed_fields:
+        values.pop(name, None)
+    values.update(diff.fields)
+
+    for name in SECTIONS:
+        if name in diff.sections:
+            values[name] = _patch_section(doc, name, diff.sections[name])
+        else:
+            items = getattr(doc, name)
+            values[name] = list(items) if items is not None else None
+
+    return type(doc).model_construct(**values)
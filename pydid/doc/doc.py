@@ -1,20 +1,36 @@
 """DID Document Object."""
 
+import hashlib
 from abc import ABC
-from typing import Any, List, Optional, Union
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from pydantic import Field, field_validator
-from typing_extensions import Annotated
+from inflection import underscore
+from pydantic import Field, TypeAdapter, ValidationError, field_validator
+from typing_extensions import Annotated, get_args
 
 from ..did import DID, InvalidDIDError
 from ..did_url import DIDUrl, InvalidDIDUrlError
-from ..resource import IndexedResource, Resource
+from ..registry import RegisteredMethod, RegisteredService
+from ..resource import IndexedResource, Resource, canonical_digest
 from ..service import DIDCommV1Service, DIDCommV2Service, Service
+from ..validation import _EXHAUSTED
 from ..verification_method import (
     KnownVerificationMethods,
     UnknownVerificationMethod,
     VerificationMethod,
 )
+from .query import DIDCommEndpoint, DocumentQueryIndex, ResolvedRelationship
+from .section import DocumentSection
 
 
 class DIDDocumentError(Exception):
@@ -29,6 +45,23 @@ class IDNotFoundError(DIDDocumentError):
     """Raised when Resource ID not found in DID Document."""
 
 
+RELATIONSHIPS = (
+    "authentication",
+    "assertion_method",
+    "key_agreement",
+    "capability_invocation",
+    "capability_delegation",
+)
+SECTIONS = ("verification_method",) + RELATIONSHIPS + ("service",)
+
+
+class SalvageDiagnostic(NamedTuple):
+    """Record of a document member that failed validation during salvage."""
+
+    path: Tuple[Union[str, int], ...]
+    error: ValidationError
+
+
 class DIDDocumentRoot(Resource):
     """Representation of DID Document."""
 
@@ -60,20 +93,105 @@ class DIDDocumentRoot(Resource):
 class BaseDIDDocument(DIDDocumentRoot, IndexedResource, ABC):
     """Abstract BaseDIDDocument class."""
 
+    _diagnostics: List[SalvageDiagnostic] = []
+
+    @property
+    def diagnostics(self) -> List[SalvageDiagnostic]:
+        """Return the members that failed validation when salvaging the doc."""
+        return self._diagnostics
+
     @property
     def is_nonconformant(self):
         """Return whether doc is non-conformant."""
-        return isinstance(self, NonconformantDocument)
+        return isinstance(self, NonconformantDocument) or bool(self._diagnostics)
 
     @property
     def is_conformant(self):
         """Return whether doc is conformant."""
-        return not isinstance(self, NonconformantDocument)
+        return not self.is_nonconformant
+
+    def digest(self) -> str:
+        """Return a stable digest of the document content.
+
+        Digests of the top level properties and of each section member are
+        combined, Merkle style. Member digests are cached on the members, so
+        only properties and members changed since the last call are
+        serialized again.
+        """
+        if self._digest is None:
+            self._digest = canonical_digest(self, exclude=SECTIONS)
+        parts = [self._digest]
+        for name in SECTIONS:
+            items = getattr(self, name)
+            if items is None:
+                continue
+            parts.append(type(self).model_fields[name].alias)
+            if not isinstance(items, list):
+                parts.append(canonical_digest(items))
+                continue
+            for item in items:
+                parts.append(
+                    item.digest()
+                    if isinstance(item, Resource)
+                    else canonical_digest(item)
+                )
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def __copy__(self):
+        """Return shallow copy with its own section lists and index."""
+        copied = super().__copy__()
+        copied._index = dict(self._index)
+        for name in SECTIONS:
+            items = copied.__dict__.get(name)
+            if isinstance(items, list):
+                copied.__dict__[name] = list(items)
+        return copied
+
+    def _index_keys(self, ref: DIDUrl) -> List[str]:
+        """Return the keys a resource identified by ref is indexed under.
+
+        Resources are indexed by absolute DID URL, by the id as written in the
+        document, and, when within this document, by the reference relative to
+        the document DID (e.g. "#key-1"). This permits dereferencing any of
+        these forms with a single lookup.
+        """
+        absolute = ref if ref.did else ref.as_absolute(self.id)
+        keys = [absolute]
+        if ref != absolute:
+            keys.append(str(ref))
+        if absolute.did == self.id:
+            relative = absolute[len(self.id) :]
+            if relative not in keys:
+                keys.append(relative)
+        return keys
+
+    def dereference(self, reference: Union[str, DIDUrl]) -> Resource:
+        """Dereference a DID URL to a document resource.
+
+        Absolute DID URLs, ids as written in the document, and references
+        relative to the document DID are found without parsing the reference.
+        """
+        self.build_index()
+        resource = self._index.get(reference)
+        if resource is not None:
+            return resource
+
+        if isinstance(reference, str):
+            reference = DIDUrl.parse(reference)
+        if not reference.did:
+            reference = reference.as_absolute(self.id)
+
+        if reference not in self._index:
+            raise IDNotFoundError("ID {} not found in document".format(reference))
+        return self._index[reference]
 
 
 class BasicDIDDocument(BaseDIDDocument):
     """Basic DID Document."""
 
+    _query_index: Optional[DocumentQueryIndex] = None
+    _index_refs: Dict[str, int] = {}
+
     def _index_resources(self):
         """Index resources by ID.
 
@@ -81,54 +199,263 @@ class BasicDIDDocument(BaseDIDDocument):
         The first instance is stored in the index and subsequent id collisions
         are checked against the original. If they do not match, an error will
         be thrown.
-        """
 
-        def _indexer(item):
+        Sections are DocumentSections from construction, so later changes to
+        them update the index incrementally.
+        """
+        self._index = {}
+        self._index_refs = {}
+        for name in SECTIONS:
+            items = getattr(self, name)
+            if isinstance(items, list):
+                self._index_items(items)
+
+    @staticmethod
+    def _indexable(items: Optional[list]):
+        """Return the resources to be indexed from a section.
+
+        Sections that are not lists, and items that are neither resources nor
+        nested lists, such as salvaged items that failed validation, are left
+        unindexed.
+        """
+        stack = [iter(items if isinstance(items, list) else [])]
+        while stack:
+            item = next(stack[-1], _EXHAUSTED)
+            if item is _EXHAUSTED:
+                stack.pop()
+                continue
             if not item:
-                # Attribute isn't set
-                return
+                # Empty entries
+                continue
             if isinstance(item, DIDUrl):
                 # We don't index references
-                return
+                continue
             if isinstance(item, list):
-                for subitem in item:
-                    _indexer(subitem)
-                return
-
-            assert isinstance(item, (VerificationMethod, Service))
-            if item.id in self._index and item != self._index[item.id]:
-                raise IdentifiedResourceMismatch(
-                    "ID {} already found in Index and Items do not match".format(item.id)
-                )
+                stack.append(iter(item))
+                continue
+            if isinstance(item, (VerificationMethod, Service)):
+                yield item
+
+    def _index_items(self, items: list):
+        """Add resources to the index, checking for id collisions."""
+        added = []
+        try:
+            for item in self._indexable(items):
+                keys = self._index_keys(item.id)
+                current = self._index.get(keys[0])
+                if current is not None and item != current:
+                    raise IdentifiedResourceMismatch(
+                        "ID {} already found in Index and Items do not match".format(
+                            item.id
+                        )
+                    )
+                if current is None:
+                    for key in keys:
+                        self._index[key] = item
+                self._index_refs[keys[0]] = self._index_refs.get(keys[0], 0) + 1
+                added.append(item)
+        except IdentifiedResourceMismatch:
+            self._unindex_items(added)
+            raise
+
+    def _unindex_items(self, items: list):
+        """Remove resources from the index once no section holds their id."""
+        for item in self._indexable(items):
+            keys = self._index_keys(item.id)
+            count = self._index_refs.get(keys[0], 0) - 1
+            if count > 0:
+                self._index_refs[keys[0]] = count
+                continue
+            self._index_refs.pop(keys[0], None)
+            for key in keys:
+                self._index.pop(key, None)
+
+    def _section_changed(self, removed: list, added: list):
+        """Update the index for a change to a section before it is applied."""
+        if self._indexed:
+            self._unindex_items(removed)
+            try:
+                self._index_items(added)
+            except IdentifiedResourceMismatch:
+                self._index_items(removed)
+                raise
+        self._invalidate_caches()
+
+    def _invalidate_caches(self):
+        """Clear values derived from the document contents."""
+        self._query_index = None
+
+    def __setattr__(self, name: str, value: Any):
+        """Set attribute, keeping the index current when sections are replaced."""
+        if name in SECTIONS and value is not self.__dict__.get(name):
+            self._section_changed(list(getattr(self, name) or []), list(value or []))
+            if isinstance(value, list):
+                value = DocumentSection(value, self)
+        super().__setattr__(name, value)
+
+    def model_post_init(self, context: Any):
+        """Observe section lists, which keep their identity from here on."""
+        super().model_post_init(context)
+        self._observe_sections()
+
+    def _observe_sections(self):
+        """Give the document its own section lists, observed by the document."""
+        for name in SECTIONS:
+            items = getattr(self, name)
+            if isinstance(items, list):
+                self.__dict__[name] = DocumentSection(items, self)
+
+    def __copy__(self):
+        """Return shallow copy with its own section lists."""
+        copied = super().__copy__()
+        copied._index_refs = dict(self._index_refs)
+        copied._query_index = None
+        copied._observe_sections()
+        return copied
+
+    def __deepcopy__(self, memo=None):
+        """Return deep copy."""
+        copied = super().__deepcopy__(memo)
+        copied._observe_sections()
+        return copied
+
+    def __setstate__(self, state):
+        """Restore pickled document."""
+        super().__setstate__(state)
+        self._observe_sections()
 
-            if not item.id.did:
-                key = item.id.as_absolute(self.id)
-            else:
-                key = item.id
+    @property
+    def query_index(self) -> DocumentQueryIndex:
+        """Return secondary indexes over this document, built on first use."""
+        if self._query_index is None:
+            self._query_index = DocumentQueryIndex(self.build_index())
+        return self._query_index
+
+    def find_methods(
+        self,
+        *,
+        type: Optional[str] = None,
+        relationship: Optional[str] = None,
+        controller: Optional[str] = None,
+        material: Any = None,
+        material_property: Optional[str] = None,
+    ) -> List[VerificationMethod]:
+        """Return verification methods matching every given criterion.
+
+        Relationships match methods embedded in or referenced by the
+        relationship. Material matches the value of material_property, or of
+        any material property if not given. Results are answered from the
+        query index and ordered by first appearance in the document.
+        """
+        return self.query_index.find_methods(
+            type=type,
+            relationship=relationship,
+            controller=controller,
+            material=material,
+            material_property=material_property,
+        )
+
+    def find_services(self, *, type: Optional[str] = None) -> List[Service]:
+        """Return services of the given type, answered from the query index."""
+        return self.query_index.find_services(type=type)
+
+    def didcomm_endpoints(
+        self,
+        *,
+        version: Optional[int] = None,
+        accept: Union[str, Sequence[str], None] = None,
+    ) -> List[DIDCommEndpoint]:
+        """Return DIDComm endpoints in order of preference with keys resolved.
+
+        V2 endpoints come first in document order, followed by V1 endpoints by
+        priority. Endpoints are expanded from services once, when the query
+        index is built; changes made in place to services are not detected.
+        """
+        return self.query_index.didcomm_endpoints(version=version, accept=accept)
 
-            self._index[key] = item
+    def resolve_relationship(self, relationship: str) -> ResolvedRelationship:
+        """Return the verification methods of a relationship.
 
-        for item in (
-            self.verification_method,
-            self.authentication,
-            self.assertion_method,
-            self.key_agreement,
-            self.capability_invocation,
-            self.capability_delegation,
-            self.service,
-        ):
-            _indexer(item)
+        References are resolved against this document once, when the query
+        index is built. References to other documents or to missing ids are
+        reported on the result instead of being dropped.
+        """
+        name = underscore(relationship)
+        if name not in RELATIONSHIPS:
+            raise ValueError("{} is not a verification relationship".format(relationship))
+        return self.query_index.relationships[name]
 
-    def dereference(self, reference: Union[str, DIDUrl]) -> Resource:
-        """Dereference a DID URL to a document resource."""
-        if isinstance(reference, str):
-            reference = DIDUrl.parse(reference)
-        if not reference.did:
-            reference = reference.as_absolute(self.id)
+    _item_adapters: ClassVar[Dict[Tuple[type, str], TypeAdapter]] = {}
 
-        if reference not in self._index:
-            raise IDNotFoundError("ID {} not found in document".format(reference))
-        return self._index[reference]
+    @classmethod
+    def _item_adapter(cls, name: str) -> TypeAdapter:
+        """Return a cached adapter validating single items of a section."""
+        key = (cls, name)
+        if key not in cls._item_adapters:
+            (list_type,) = [
+                arg
+                for arg in get_args(cls.model_fields[name].annotation)
+                if arg is not type(None)
+            ]
+            (item_type,) = get_args(list_type)
+            cls._item_adapters[key] = TypeAdapter(item_type)
+        return cls._item_adapters[key]
+
+    @classmethod
+    def salvage(cls, value: dict):
+        """Deserialize a document, keeping whatever validates.
+
+        Each verification method, relationship entry, and service is validated
+        on its own in a single pass over the document. Items that fail are kept
+        in their raw form in place and described in the diagnostics of the
+        returned document. The remaining top level properties are validated
+        together; properties that fail are likewise kept raw. A document
+        without a valid id cannot be salvaged.
+        """
+        aliases = {cls.model_fields[name].alias: name for name in SECTIONS}
+        diagnostics: List[SalvageDiagnostic] = []
+        sections: Dict[str, list] = {}
+        for key, name in aliases.items():
+            raw = value.get(key)
+            if not isinstance(raw, list):
+                # Left to validation with the remaining properties
+                continue
+
+            adapter = cls._item_adapter(name)
+            items = []
+            for index, item in enumerate(raw):
+                try:
+                    items.append(adapter.validate_python(item))
+                except ValidationError as error:
+                    diagnostics.append(SalvageDiagnostic((key, index), error))
+                    items.append(item)
+            sections[name] = items
+
+        rest = {
+            key: item for key, item in value.items() if aliases.get(key) not in sections
+        }
+        raw_props = {}
+        try:
+            root = DIDDocumentRoot.model_validate(rest)
+        except ValidationError as error:
+            failed = {err["loc"][0] for err in error.errors() if err["loc"]}
+            if "id" in failed:
+                raise ValueError("Cannot salvage document without a valid id") from error
+            diagnostics.extend(SalvageDiagnostic((key,), error) for key in sorted(failed))
+            raw_props = {key: rest.pop(key) for key in failed}
+            root = DIDDocumentRoot.model_validate(rest)
+
+        # Sections failing validation as a whole are kept raw as extras only,
+        # leaving the typed section unset
+        raw_sections = {key: raw_props.pop(key) for key in aliases if key in raw_props}
+        fields = {name: getattr(root, name) for name in root.model_fields_set}
+        fields.update(root.model_extra or {})
+        fields.update(raw_props)
+        fields.update(sections)
+        doc = cls.model_construct(**fields)
+        doc.__pydantic_extra__.update(raw_sections)
+        doc._diagnostics = diagnostics
+        return doc
 
 
 PossibleMethodTypes = Union[KnownVerificationMethods, UnknownVerificationMethod]
@@ -139,15 +466,17 @@ class DIDDocument(BasicDIDDocument):
     """DID Document for DID Spec version 1.0.
 
     Registered verification method and service types are parsed into specific objects.
+    Types are looked up in the registries of :mod:`pydid.registry`, so classes
+    registered at runtime are used without redefining the document.
     """
 
-    verification_method: Optional[List[PossibleMethodTypes]] = None
-    authentication: Optional[List[Union[DIDUrl, PossibleMethodTypes]]] = None
-    assertion_method: Optional[List[Union[DIDUrl, PossibleMethodTypes]]] = None
-    key_agreement: Optional[List[Union[DIDUrl, PossibleMethodTypes]]] = None
-    capability_invocation: Optional[List[Union[DIDUrl, PossibleMethodTypes]]] = None
-    capability_delegation: Optional[List[Union[DIDUrl, PossibleMethodTypes]]] = None
-    service: Optional[List[PossibleServiceTypes]] = None
+    verification_method: Optional[List[RegisteredMethod]] = None
+    authentication: Optional[List[Union[DIDUrl, RegisteredMethod]]] = None
+    assertion_method: Optional[List[Union[DIDUrl, RegisteredMethod]]] = None
+    key_agreement: Optional[List[Union[DIDUrl, RegisteredMethod]]] = None
+    capability_invocation: Optional[List[Union[DIDUrl, RegisteredMethod]]] = None
+    capability_delegation: Optional[List[Union[DIDUrl, RegisteredMethod]]] = None
+    service: Optional[List[RegisteredService]] = None
 
     @classmethod
     def deserialize(cls, value: dict) -> "DIDDocument":
@@ -180,49 +509,58 @@ class NonconformantDocument(BaseDIDDocument):
 
         This is done in the most permissive way possible. ID collisions will
         result in overwritten data instead of raising an error.
+
+        The index holds the raw dictionaries; they are wrapped as Resources
+        when dereferenced.
         """
+        self._index = {}
+
+        # Walk depth first with an explicit stack of iterators, preserving the
+        # order in which a recursive walk would index resources
+        stack = [iter(value for _, value in self)]
+        while stack:
+            item = next(stack[-1], _EXHAUSTED)
+            if item is _EXHAUSTED:
+                stack.pop()
+                continue
 
-        def _indexer(item):
             if isinstance(item, list):
-                # Recurse on lists
-                for subitem in item:
-                    _indexer(subitem)
-                return
+                stack.append(iter(item))
+                continue
 
             if not isinstance(item, dict):
                 # Only dictionaries are indexable
-                return
+                continue
 
             if "id" not in item:
                 # Only dictionaries with IDs are indexed
-                return
+                continue
 
-            # Attempt to account for relative IDs
-            try:
-                ref = DIDUrl(item["id"])
-                if not ref.did:
-                    key = ref.as_absolute(self.id)
-                else:
-                    key = ref
-            except (InvalidDIDError, InvalidDIDUrlError):
-                key = item["id"]
-
-            self._index[key] = Resource(**item)
+            for key in self._raw_index_keys(item):
+                self._index[key] = item
 
-            # Recurse
-            for value in item.values():
-                _indexer(value)
-
-        for _, value in self:
-            _indexer(value)
+            stack.append(iter(item.values()))
 
     def dereference(self, reference: Union[str, DIDUrl]) -> Resource:
-        """Dereference a DID URL to a document resource."""
-        if isinstance(reference, str):
-            reference = DIDUrl.parse(reference)
-        if not reference.did:
-            reference = reference.as_absolute(self.id)
+        """Dereference a DID URL to a document resource.
 
-        if reference not in self._index:
-            raise IDNotFoundError("ID {} not found in document".format(reference))
-        return self._index[reference]
+        The resource is created from the raw dictionary on first dereference
+        and reused afterwards.
+        """
+        item = super().dereference(reference)
+        if isinstance(item, Resource):
+            return item
+
+        resource = Resource(**item)
+        for key in self._raw_index_keys(item):
+            if self._index.get(key) is item:
+                self._index[key] = resource
+        return resource
+
+    def _raw_index_keys(self, item: dict) -> List[str]:
+        """Return index keys for a raw dictionary with an id."""
+        # Attempt to account for relative IDs
+        try:
+            return self._index_keys(DIDUrl(item["id"]))
+        except (InvalidDIDError, InvalidDIDUrlError):
+            return [item["id"]]
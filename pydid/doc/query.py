@@ -0,0 +1,282 @@
+"""Secondary indexes for querying the contents of DID Documents."""
+
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
+
+from inflection import underscore
+
+from ..did_url import DIDUrl
+from ..service import DIDCommV1Service, DIDCommV2Service, Service
+from ..verification_method import VerificationMethod
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .doc import BasicDIDDocument
+
+T = TypeVar("T")
+
+
+def _hashable(value: Any) -> Hashable:
+    """Return a hashable representation of a material value."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _hashable(item)) for key, item in value.items()))
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    return value
+
+
+def _intersect(candidates: Sequence[List[T]], positions: Dict[int, int]) -> List[T]:
+    """Return members present in every list, ordered by their position."""
+    first, *rest = sorted(candidates, key=len)
+    others = [{id(item) for item in items} for items in rest]
+    return sorted(
+        (item for item in first if all(id(item) in other for other in others)),
+        key=lambda item: positions[id(item)],
+    )
+
+
+class ResolvedRelationship(NamedTuple):
+    """Verification methods of a relationship with references resolved.
+
+    Methods holds the embedded and locally referenced methods in order.
+    References to other documents are listed in external and references to
+    ids missing from the document in missing, both in absolute form.
+    """
+
+    methods: List[VerificationMethod]
+    external: List[DIDUrl]
+    missing: List[DIDUrl]
+
+
+class DIDCommEndpoint(NamedTuple):
+    """A DIDComm endpoint of a document with its keys resolved.
+
+    Keys are resolved to the verification methods of the document; references
+    to other documents or missing ids are left as DIDUrls. Recipient keys of
+    DIDComm V2 endpoints are the key agreement methods of the document.
+    """
+
+    service: Service
+    version: int
+    uri: Any
+    accept: Optional[List[str]]
+    priority: int
+    # Typing caches equal unions, so members are ordered as in the document
+    # relationship annotations to avoid changing the order pydantic tries
+    recipient_keys: List[Union[DIDUrl, VerificationMethod]]
+    routing_keys: List[Union[DIDUrl, VerificationMethod]]
+
+
+def _resolve_key(
+    doc: "BasicDIDDocument", ref: DIDUrl
+) -> Union[DIDUrl, VerificationMethod]:
+    """Return the method of doc referenced by ref, or ref if not found."""
+    vmethod = doc._index.get(ref)
+    return vmethod if isinstance(vmethod, VerificationMethod) else ref
+
+
+class DocumentQueryIndex:
+    """Secondary indexes over the verification methods and services of a doc.
+
+    Methods are indexed by type, by material property and value, by material
+    value alone, by controller, and by the relationships they appear in,
+    whether embedded or referenced. Services are indexed by type, and DIDComm services are
+    expanded into their endpoints, V2 endpoints first in document order
+    followed by V1 endpoints ordered by priority.
+    """
+
+    def __init__(self, doc: "BasicDIDDocument"):
+        """Build indexes for doc."""
+        from .doc import RELATIONSHIPS
+
+        self._seen = set()
+        self.methods: List[VerificationMethod] = []
+        self._positions: Dict[int, int] = {}
+        self.by_type: Dict[str, List[VerificationMethod]] = {}
+        self.by_material: Dict[tuple, List[VerificationMethod]] = {}
+        self.by_material_value: Dict[Any, List[VerificationMethod]] = {}
+        self.by_material_property: Dict[str, List[VerificationMethod]] = {}
+        self.by_controller: Dict[str, List[VerificationMethod]] = {}
+        self.by_relationship: Dict[str, List[VerificationMethod]] = {}
+        self.relationships: Dict[str, ResolvedRelationship] = {}
+        self.services: List[Service] = []
+        self.services_by_type: Dict[str, List[Service]] = {}
+        self.didcomm: List[DIDCommEndpoint] = []
+
+        for vmethod in doc.verification_method or []:
+            if isinstance(vmethod, VerificationMethod):
+                self._add_method(doc, vmethod)
+
+        for relationship in RELATIONSHIPS:
+            self._add_relationship(doc, relationship, getattr(doc, relationship) or [])
+
+        for service in doc.service or []:
+            if isinstance(service, Service):
+                self._add_service(service)
+        self._add_didcomm(doc)
+
+    def _add_method(
+        self, doc: "BasicDIDDocument", vmethod: VerificationMethod
+    ) -> VerificationMethod:
+        """Index a method, returning the instance held by the document index."""
+        key = doc._index_keys(vmethod.id)[0]
+        vmethod = doc._index.get(key, vmethod)
+        if key in self._seen:
+            return vmethod
+        self._seen.add(key)
+        self._positions[id(vmethod)] = len(self.methods)
+        self.methods.append(vmethod)
+        self.by_type.setdefault(vmethod.type, []).append(vmethod)
+        self.by_controller.setdefault(vmethod.controller, []).append(vmethod)
+        props = set(vmethod.material_properties)
+        if vmethod._material_prop:
+            props.add(vmethod._material_prop)
+        values = []
+        for prop in props:
+            value = getattr(vmethod, prop, None)
+            if value is not None:
+                value = _hashable(value)
+                self.by_material.setdefault((prop, value), []).append(vmethod)
+                self.by_material_property.setdefault(prop, []).append(vmethod)
+                if value not in values:
+                    values.append(value)
+        for value in values:
+            self.by_material_value.setdefault(value, []).append(vmethod)
+        return vmethod
+
+    def _add_relationship(self, doc: "BasicDIDDocument", relationship: str, items: list):
+        """Index and resolve the embedded and referenced methods of a relationship."""
+        resolved = ResolvedRelationship([], [], [])
+        member_ids = set()
+        for item in items:
+            if isinstance(item, VerificationMethod):
+                vmethod = self._add_method(doc, item)
+            elif isinstance(item, DIDUrl):
+                vmethod = doc._index.get(item)
+                if not isinstance(vmethod, VerificationMethod):
+                    ref = item if item.did else item.as_absolute(doc.id)
+                    if ref.did != doc.id:
+                        resolved.external.append(ref)
+                    else:
+                        resolved.missing.append(ref)
+                    continue
+            else:
+                continue
+            if id(vmethod) not in member_ids:
+                member_ids.add(id(vmethod))
+                resolved.methods.append(vmethod)
+        self.relationships[relationship] = resolved
+        self.by_relationship[relationship] = resolved.methods
+
+    def _add_service(self, service: Service):
+        """Index a service by each of its types."""
+        self.services.append(service)
+        types = service.type if isinstance(service.type, list) else [service.type]
+        for typ in dict.fromkeys(types):
+            self.services_by_type.setdefault(typ, []).append(service)
+
+    def _add_didcomm(self, doc: "BasicDIDDocument"):
+        """Expand DIDComm services into endpoints with resolved keys."""
+        agreement = list(self.by_relationship.get("key_agreement", []))
+        v1 = []
+        for service in self.services:
+            if isinstance(service, DIDCommV2Service):
+                endpoints = service.service_endpoint
+                if not isinstance(endpoints, list):
+                    endpoints = [endpoints]
+                for endpoint in endpoints:
+                    self.didcomm.append(
+                        DIDCommEndpoint(
+                            service,
+                            2,
+                            endpoint.uri,
+                            endpoint.accept,
+                            0,
+                            agreement,
+                            [_resolve_key(doc, key) for key in endpoint.routing_keys],
+                        )
+                    )
+            elif isinstance(service, DIDCommV1Service):
+                v1.append(
+                    DIDCommEndpoint(
+                        service,
+                        1,
+                        service.service_endpoint,
+                        service.accept,
+                        service.priority,
+                        [_resolve_key(doc, key) for key in service.recipient_keys],
+                        [_resolve_key(doc, key) for key in service.routing_keys],
+                    )
+                )
+        self.didcomm.extend(sorted(v1, key=lambda endpoint: endpoint.priority))
+
+    def didcomm_endpoints(
+        self,
+        *,
+        version: Optional[int] = None,
+        accept: Union[str, Sequence[str], None] = None,
+    ) -> List[DIDCommEndpoint]:
+        """Return DIDComm endpoints of the given version accepting any of accept.
+
+        Endpoints not declaring what they accept match any accept value.
+        """
+        if isinstance(accept, str):
+            accept = [accept]
+        return [
+            endpoint
+            for endpoint in self.didcomm
+            if (version is None or endpoint.version == version)
+            and (
+                accept is None
+                or endpoint.accept is None
+                or any(media_type in endpoint.accept for media_type in accept)
+            )
+        ]
+
+    def find_methods(
+        self,
+        *,
+        type: Optional[str] = None,
+        relationship: Optional[str] = None,
+        controller: Optional[str] = None,
+        material: Any = None,
+        material_property: Optional[str] = None,
+    ) -> List[VerificationMethod]:
+        """Return methods matching every given criterion."""
+        candidates: List[List[VerificationMethod]] = []
+        if type is not None:
+            candidates.append(self.by_type.get(type, []))
+        if relationship is not None:
+            candidates.append(self.by_relationship.get(underscore(relationship), []))
+        if controller is not None:
+            candidates.append(self.by_controller.get(controller, []))
+        if material is not None and material_property:
+            candidates.append(
+                self.by_material.get(
+                    (underscore(material_property), _hashable(material)), []
+                )
+            )
+        elif material is not None:
+            candidates.append(self.by_material_value.get(_hashable(material), []))
+        elif material_property is not None:
+            candidates.append(
+                self.by_material_property.get(underscore(material_property), [])
+            )
+        if not candidates:
+            return list(self.methods)
+        return _intersect(candidates, self._positions)
+
+    def find_services(self, *, type: Optional[str] = None) -> List[Service]:
+        """Return services matching the given criteria."""
+        if type is None:
+            return list(self.services)
+        return list(self.services_by_type.get(type, []))
@@ -0,0 +1,109 @@
+"""Observed containers for DID Document sections."""
+
+import weakref
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .doc import BasicDIDDocument
+
+
+class DocumentSection(list):
+    """List of document section members that reports changes to its document.
+
+    Changes are reported before they are applied so the document may reject
+    them, e.g. when an added resource collides with a different resource of the
+    same id. Copies and pickles of a section are plain lists.
+    """
+
+    def __init__(self, items: Iterable = (), doc: Optional["BasicDIDDocument"] = None):
+        """Initialize section."""
+        super().__init__(items)
+        self._doc = weakref.ref(doc) if doc is not None else None
+
+    def _changing(self, removed: List[Any], added: List[Any]):
+        """Report a change to the owning document."""
+        doc = self._doc() if self._doc else None
+        if doc is not None:
+            doc._section_changed(removed, added)
+
+    def append(self, item):
+        """Append item."""
+        self._changing([], [item])
+        super().append(item)
+
+    def extend(self, items: Iterable):
+        """Extend with items."""
+        items = list(items)
+        self._changing([], items)
+        super().extend(items)
+
+    def __iadd__(self, items: Iterable):
+        """Extend with items."""
+        self.extend(items)
+        return self
+
+    def insert(self, index, item):
+        """Insert item before index."""
+        self._changing([], [item])
+        super().insert(index, item)
+
+    def remove(self, item):
+        """Remove first occurrence of item."""
+        index = self.index(item)
+        self._changing([self[index]], [])
+        super().__delitem__(index)
+
+    def pop(self, index=-1):
+        """Remove and return item at index."""
+        item = self[index]
+        self._changing([item], [])
+        return super().pop(index)
+
+    def clear(self):
+        """Remove all items."""
+        self._changing(list(self), [])
+        super().clear()
+
+    def __setitem__(self, index, value):
+        """Replace item or slice."""
+        if isinstance(index, slice):
+            value = list(value)
+            removed = self[index]
+            if index.step not in (None, 1) and len(value) != len(removed):
+                # Rejected by list before the change is reported
+                raise ValueError(
+                    "attempt to assign sequence of size {} "
+                    "to extended slice of size {}".format(len(value), len(removed))
+                )
+            self._changing(removed, value)
+        else:
+            self._changing([self[index]], [value])
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index):
+        """Delete item or slice."""
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        self._changing(removed, [])
+        super().__delitem__(index)
+
+    def __imul__(self, count: int):
+        """Repeat items in place."""
+        if count <= 0:
+            self.clear()
+        else:
+            self.extend(list(self) * (count - 1))
+        return self
+
+    def sort(self, *args, **kwargs):
+        """Sort items in place."""
+        self._changing([], [])
+        super().sort(*args, **kwargs)
+
+    def reverse(self):
+        """Reverse items in place."""
+        self._changing([], [])
+        super().reverse()
+
+    def __reduce_ex__(self, protocol):
+        """Copy and pickle as a plain list."""
+        return list, (list(self),)
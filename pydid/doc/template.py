@@ -0,0 +1,253 @@
+"""Templates for generating many documents of the same shape."""
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, NamedTuple, Optional, Union
+
+from ..did import DID
+from ..did_url import DIDUrl
+from ..resource import Resource
+from ..service import Service
+from ..verification_method import VerificationMethod
+from .doc import SECTIONS, DIDDocument
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .builder import DIDDocumentBuilder
+
+
+class _Params(NamedTuple):
+    """Parameters of a single instantiation."""
+
+    did: DID
+    materials: Dict[str, Any]
+    endpoints: Dict[str, Any]
+
+
+Plan = Callable[[_Params], Any]
+
+# Characters that may follow the DID in a DID URL
+_DID_URL_DELIMITERS = "#/?;"
+
+
+def _rebase(url: DIDUrl, did: DID) -> DIDUrl:
+    """Return url with its DID replaced, without parsing it again."""
+    rebased = DIDUrl.__new__(DIDUrl, did + url[len(url.did) :])
+    rebased.did = str(did)
+    rebased.path = url.path
+    rebased.query = dict(url.query) if url.query else None
+    rebased.fragment = url.fragment
+    return rebased
+
+
+def _construct(cls, value: Resource) -> Callable[[Dict[str, Any]], Resource]:
+    """Return a function constructing an instance of cls without validation."""
+    material_prop = getattr(value, "_material_prop", None)
+
+    def construct(fields: Dict[str, Any]) -> Resource:
+        resource = cls.model_construct(**fields)
+        if material_prop:
+            resource._material_prop = material_prop
+        return resource
+
+    return construct
+
+
+class DocumentTemplate:
+    """Document shape compiled once and instantiated for many DIDs.
+
+    Every occurrence of the DID of the source document, in ids, controllers,
+    and references, is replaced by the DID given on instantiation. Materials
+    and endpoints may be replaced per instance, keyed by the fragment of the
+    method or service id: a material replaces the verification material of the
+    method and an endpoint replaces the service endpoint, or the uri of a
+    DIDComm V2 endpoint.
+
+    Instantiation neither copies the source document nor revalidates it;
+    only the DID is validated. Materials and endpoints are used as given.
+    """
+
+    def __init__(self, doc: DIDDocument):
+        """Compile template from doc."""
+        self.did = str(doc.id)
+        self.material_idents = set()
+        self.endpoint_idents = set()
+        self._typed = self._compile_document(doc, doc)
+        self._json = self._compile_document(doc, doc.serialize())
+
+    @classmethod
+    def from_doc(cls, doc: DIDDocument) -> "DocumentTemplate":
+        """Compile template from an example document."""
+        return cls(doc)
+
+    @classmethod
+    def from_builder(cls, builder: "DIDDocumentBuilder") -> "DocumentTemplate":
+        """Compile template from a document builder."""
+        return cls(builder.build())
+
+    def _params(
+        self,
+        did: Union[str, DID],
+        materials: Optional[Dict[str, Any]],
+        endpoints: Optional[Dict[str, Any]],
+    ) -> _Params:
+        """Return validated parameters of an instantiation."""
+        materials = materials or {}
+        endpoints = endpoints or {}
+        unknown = (set(materials) - self.material_idents) | (
+            set(endpoints) - self.endpoint_idents
+        )
+        if unknown:
+            raise ValueError(
+                "Unknown template idents: {}".format(", ".join(sorted(unknown)))
+            )
+        return _Params(DID(did), materials, endpoints)
+
+    def instantiate(
+        self,
+        did: Union[str, DID],
+        materials: Optional[Dict[str, Any]] = None,
+        endpoints: Optional[Dict[str, Any]] = None,
+    ) -> DIDDocument:
+        """Return a document of this shape for did."""
+        return self._typed(self._params(did, materials, endpoints))
+
+    def render(
+        self,
+        did: Union[str, DID],
+        materials: Optional[Dict[str, Any]] = None,
+        endpoints: Optional[Dict[str, Any]] = None,
+    ) -> dict:
+        """Return the serialized form of a document of this shape for did.
+
+        Equivalent to instantiate(...).serialize() without building models.
+        """
+        return self._json(self._params(did, materials, endpoints))
+
+    def _compile_document(self, doc: DIDDocument, value: Any) -> Plan:
+        """Compile the typed document or its serialized form."""
+        cls = type(doc)
+        if value is doc:
+            members = {name: getattr(doc, name) for name in cls.model_fields}
+            members.update(doc.model_extra or {})
+            sections = {name: name for name in SECTIONS}
+        else:
+            members = value
+            sections = {cls.model_fields[name].alias: name for name in SECTIONS}
+
+        plans = {}
+        for name, member in members.items():
+            if name in sections and member is not None:
+                plans[name] = self._compile_section(getattr(doc, sections[name]), member)
+            else:
+                plans[name] = self._compile(member)
+
+        if value is doc:
+            return lambda params: cls.model_construct(
+                **{name: plan(params) for name, plan in plans.items()}
+            )
+        return lambda params: {name: plan(params) for name, plan in plans.items()}
+
+    def _compile_section(self, items: list, values: list) -> Plan:
+        """Compile a section, adding slots for materials and endpoints."""
+        plans = []
+        for item, value in zip(items, values):
+            if isinstance(item, VerificationMethod) and item.id.fragment:
+                plans.append(self._compile_method(item, value))
+            elif isinstance(item, Service) and item.id.fragment:
+                plans.append(self._compile_service(item, value))
+            else:
+                plans.append(self._compile(value))
+        return lambda params: [plan(params) for plan in plans]
+
+    def _compile_method(self, item: VerificationMethod, value: Any) -> Plan:
+        """Compile a method with a slot for its material."""
+        prop = item._material_prop or next(
+            (prop for prop in item.material_properties if getattr(item, prop, None)),
+            None,
+        )
+        if prop is None:
+            return self._compile(value)
+        if isinstance(value, dict):
+            prop = type(item).model_fields[prop].alias
+        ident = item.id.fragment
+        self.material_idents.add(ident)
+        return self._compile(
+            value,
+            {prop: lambda params, default: params.materials.get(ident, default)},
+        )
+
+    def _compile_service(self, item: Service, value: Any) -> Plan:
+        """Compile a service with a slot for its endpoint."""
+        ident = item.id.fragment
+        self.endpoint_idents.add(ident)
+
+        def endpoint(params: _Params, default: Any) -> Any:
+            return params.endpoints.get(ident, default)
+
+        if isinstance(value, Resource):
+            key, nested = "service_endpoint", value.service_endpoint
+            has_uri = isinstance(nested, Resource) and "uri" in type(nested).model_fields
+        else:
+            key, nested = "serviceEndpoint", value["serviceEndpoint"]
+            has_uri = isinstance(nested, dict) and "uri" in nested
+        if has_uri:
+            uri = self._compile(nested, {"uri": endpoint})
+            return self._compile(value, {key: lambda params, default: uri(params)})
+        return self._compile(value, {key: endpoint})
+
+    def _compile(
+        self, value: Any, slots: Optional[Dict[str, Callable[[_Params, Any], Any]]] = None
+    ) -> Plan:
+        """Compile value into a function of the instantiation parameters.
+
+        Slots map member names of a resource or dictionary value to functions
+        of the parameters and the compiled default value.
+        """
+        if isinstance(value, DIDUrl):
+            if value.did == self.did:
+                return lambda params: _rebase(value, params.did)
+            return lambda params: value
+        if isinstance(value, str):
+            if value == self.did:
+                return lambda params: params.did
+            if value.startswith(self.did) and value[len(self.did)] in _DID_URL_DELIMITERS:
+                suffix = value[len(self.did) :]
+                return lambda params: params.did + suffix
+            return lambda params: value
+        if isinstance(value, list):
+            plans = [self._compile(item) for item in value]
+            return lambda params: [plan(params) for plan in plans]
+        if isinstance(value, (dict, Resource)):
+            return self._compile_mapping(value, slots or {})
+        return lambda params: value
+
+    def _compile_mapping(
+        self, value: Union[dict, Resource], slots: Dict[str, Callable]
+    ) -> Plan:
+        """Compile a resource or dictionary value."""
+        if isinstance(value, Resource):
+            members = {name: getattr(value, name) for name in type(value).model_fields}
+            members.update(value.model_extra or {})
+            construct = _construct(type(value), value)
+        else:
+            members = value
+            construct = dict
+
+        plans = {}
+        for name, member in members.items():
+            plan = self._compile(member)
+            if name in slots:
+                plan = self._slot(slots[name], plan)
+            plans[name] = plan
+        return lambda params: construct(
+            {name: plan(params) for name, plan in plans.items()}
+        )
+
+    @staticmethod
+    def _slot(slot: Callable[[_Params, Any], Any], default: Plan) -> Plan:
+        """Return a plan filling slot, falling back to the default plan."""
+        missing = object()
+
+        def plan(params: _Params) -> Any:
+            value = slot(params, missing)
+            return default(params) if value is missing else value
+
+        return plan
@@ -0,0 +1,192 @@
+"""Runtime registries of verification method and service types.
+
+Documents dispatch each verification method and service to a registered class
+by looking up its ``type`` in an index instead of trying every member of a
+fixed union. Registering a class only adds entries to that index; the schemas
+of the documents using the registry are left untouched.
+"""
+
+from typing import Any, Dict, Generic, Iterable, List, Optional, Type, TypeVar
+
+from pydantic import (
+    GetJsonSchemaHandler,
+    PlainValidator,
+    SerializeAsAny,
+    ValidationError,
+)
+from pydantic.json_schema import JsonSchemaValue
+from pydantic_core import CoreSchema, core_schema
+from typing_extensions import Annotated, get_args
+
+from .resource import Resource, is_literal
+from .service import DIDCommV1Service, DIDCommV2Service, Service
+from .verification_method import (
+    KnownVerificationMethods,
+    UnknownVerificationMethod,
+    VerificationMethod,
+)
+
+RegisteredType = TypeVar("RegisteredType", bound=Resource)
+
+
+def _literal_types(annotation) -> List[str]:
+    """Return the literal strings found in a type annotation."""
+    if is_literal(annotation):
+        return [value for value in get_args(annotation) if isinstance(value, str)]
+    types = []
+    for arg in get_args(annotation):
+        for value in _literal_types(arg):
+            if value not in types:
+                types.append(value)
+    return types
+
+
+class TypeRegistry(Generic[RegisteredType]):
+    """Index of resource classes keyed on the resource ``type`` value."""
+
+    def __init__(
+        self,
+        base: Type[RegisteredType],
+        fallback: Type[RegisteredType],
+        classes: Optional[Iterable[Type[RegisteredType]]] = None,
+    ):
+        """Initialize registry."""
+        self.base = base
+        self.fallback = fallback
+        self._by_type: Dict[str, List[Type[RegisteredType]]] = {}
+        for cls in classes or []:
+            self.register(cls)
+
+    @staticmethod
+    def types_of(cls: Type[Resource]) -> List[str]:
+        """Return the type values a class accepts, derived from its literals."""
+        field = cls.model_fields.get("type")
+        if not field:
+            return []
+        return _literal_types(field.annotation)
+
+    def register(
+        self, cls: Type[RegisteredType], types: Optional[Iterable[str]] = None
+    ) -> Type[RegisteredType]:
+        """Register a class for the given types or the types it declares.
+
+        Classes registered for the same type are tried in registration order.
+        Returns the class so this method may be used as a decorator.
+        """
+        if not issubclass(cls, self.base):
+            raise TypeError(
+                "{} is not a subclass of {}".format(cls.__name__, self.base.__name__)
+            )
+        types = list(types) if types is not None else self.types_of(cls)
+        if not types:
+            raise ValueError(
+                "Could not determine type values for {}".format(cls.__name__)
+            )
+        for typ in types:
+            candidates = self._by_type.setdefault(typ, [])
+            if cls not in candidates:
+                candidates.append(cls)
+        return cls
+
+    def unregister(self, cls: Type[RegisteredType]):
+        """Remove a class from every type it is registered for."""
+        for typ in list(self._by_type):
+            candidates = self._by_type[typ]
+            if cls in candidates:
+                candidates.remove(cls)
+            if not candidates:
+                del self._by_type[typ]
+
+    def lookup(self, typ: str) -> List[Type[RegisteredType]]:
+        """Return the classes registered for a type."""
+        return list(self._by_type.get(typ, []))
+
+    def _candidates(self, value: dict) -> List[Type[RegisteredType]]:
+        """Return the classes to attempt for a raw value, in order."""
+        types = value.get("type")
+        if not isinstance(types, list):
+            types = [types]
+        candidates = []
+        for typ in types:
+            if not isinstance(typ, str):
+                continue
+            for cls in self._by_type.get(typ, []):
+                if cls not in candidates:
+                    candidates.append(cls)
+        return candidates
+
+    def validate(self, value: Any) -> RegisteredType:
+        """Validate value as the first matching registered class.
+
+        Values that cannot be validated as any registered class for their type
+        are validated as the fallback class.
+        """
+        if isinstance(value, self.base):
+            return value
+        if isinstance(value, dict):
+            for cls in self._candidates(value):
+                try:
+                    return cls.model_validate(value)
+                except ValidationError:
+                    continue
+        return self.fallback.model_validate(value)
+
+    def classes(self) -> List[Type[RegisteredType]]:
+        """Return the registered classes, in registration order, and the fallback."""
+        classes = []
+        for candidates in self._by_type.values():
+            for cls in candidates:
+                if cls not in classes:
+                    classes.append(cls)
+        if self.fallback not in classes:
+            classes.append(self.fallback)
+        return classes
+
+    def __get_pydantic_json_schema__(
+        self, schema: CoreSchema, handler: GetJsonSchemaHandler
+    ) -> JsonSchemaValue:
+        """Return the JSON schema of a union of the classes of this registry.
+
+        The schema reflects the classes registered when it is generated.
+        """
+        return handler(
+            core_schema.union_schema(
+                [cls.__pydantic_core_schema__ for cls in self.classes()]
+            )
+        )
+
+    def annotation(self):
+        """Return an annotation dispatching validation through this registry."""
+        return Annotated[SerializeAsAny[self.base], PlainValidator(self.validate), self]
+
+    def __contains__(self, typ: str) -> bool:
+        """Return whether a type is registered."""
+        return typ in self._by_type
+
+
+VERIFICATION_METHODS: TypeRegistry[VerificationMethod] = TypeRegistry(
+    VerificationMethod,
+    UnknownVerificationMethod,
+    get_args(KnownVerificationMethods),
+)
+SERVICES: TypeRegistry[Service] = TypeRegistry(
+    Service, Service, [DIDCommV1Service, DIDCommV2Service]
+)
+
+
+def register_verification_method(
+    cls: Type[VerificationMethod], types: Optional[Iterable[str]] = None
+) -> Type[VerificationMethod]:
+    """Register a verification method class for use in DIDDocuments."""
+    return VERIFICATION_METHODS.register(cls, types)
+
+
+def register_service(
+    cls: Type[Service], types: Optional[Iterable[str]] = None
+) -> Type[Service]:
+    """Register a service class for use in DIDDocuments."""
+    return SERVICES.register(cls, types)
+
+
+RegisteredMethod = VERIFICATION_METHODS.annotation()
+RegisteredService = SERVICES.annotation()
@@ -1,11 +1,25 @@
 """Resource class that forms the base of all DID Document components."""
 
+import hashlib
 import json
+import math
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Type, TypeVar
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+)
 
 import typing_extensions
 from pydantic import BaseModel, ConfigDict, TypeAdapter, alias_generators
+from pydantic_core import to_jsonable_python
 from typing_extensions import Literal
 
 from .validation import wrap_validation_error
@@ -37,6 +51,136 @@ else:  # pragma: no cover
         return isinstance(type_, _Literal)
 
 
+class _Token(str):
+    """Literal output of the canonical JSON writer."""
+
+
+def _canonical_number(value: float) -> str:
+    """Format a number as ECMAScript Number.prototype.toString does."""
+    if not math.isfinite(value):
+        raise ValueError("{} cannot be represented in canonical JSON".format(value))
+    if value == 0:
+        return "0"
+    sign = "-" if value < 0 else ""
+    mantissa, _, exponent = repr(abs(value)).partition("e")
+    integer, _, fraction = mantissa.partition(".")
+    all_digits = integer + fraction
+    digits = all_digits.lstrip("0")
+    # Value is 0.<digits> x 10^point
+    point = len(integer) + int(exponent or 0) - (len(all_digits) - len(digits))
+    digits = digits.rstrip("0")
+    count = len(digits)
+    if count <= point <= 21:
+        return sign + digits + "0" * (point - count)
+    if 0 < point <= 21:
+        return sign + digits[:point] + "." + digits[point:]
+    if -6 < point <= 0:
+        return sign + "0." + "0" * -point + digits
+    exp = point - 1
+    exp_str = "e" + ("+" if exp >= 0 else "-") + str(abs(exp))
+    if count == 1:
+        return sign + digits + exp_str
+    return sign + digits[0] + "." + digits[1:] + exp_str
+
+
+def _resource_members(resource: "Resource", exclude: Collection[str] = ()):
+    """Return the serialized names and values of a resource's set properties."""
+    members = [
+        (field.alias or name, getattr(resource, name))
+        for name, field in type(resource).model_fields.items()
+        if name not in exclude
+    ]
+    members.extend((resource.model_extra or {}).items())
+    return [(key, value) for key, value in members if value is not None]
+
+
+def _canonical_scalar(value: Any) -> Optional[str]:
+    """Return canonical JSON for a scalar value, or None if not a JSON scalar."""
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    if value is None or isinstance(value, bool):
+        return json.dumps(value)
+    if isinstance(value, int) and abs(value) < 2**53:
+        return str(value)
+    if isinstance(value, (int, float)):
+        return _canonical_number(float(value))
+    return None
+
+
+def _push_separated(stack: list, items: list, close: str):
+    """Push items separated by commas onto the writer stack, last first."""
+    stack.append(_Token(close))
+    for index, item in enumerate(reversed(items)):
+        stack.extend(item)
+        if index < len(items) - 1:
+            stack.append(_Token(","))
+
+
+def write_canonical_json(
+    value: Any, write: Callable[[str], Any], exclude: Collection[str] = ()
+):
+    """Write value as RFC 8785 (JCS) canonical JSON.
+
+    Resources are written directly from their attributes, as serialize would
+    represent them, without building an intermediate dictionary. Exclude names
+    fields of a top level resource to omit.
+    """
+    stack = [value]
+    first = True
+    while stack:
+        item = stack.pop()
+        if type(item) is _Token:
+            write(item)
+            continue
+
+        if isinstance(item, Resource):
+            members = _resource_members(item, exclude if first else ())
+        elif isinstance(item, dict):
+            members = list(item.items())
+        else:
+            members = None
+        first = False
+
+        if members is not None:
+            members.sort(key=lambda member: member[0].encode("utf-16-be"))
+            write("{")
+            _push_separated(
+                stack,
+                [
+                    (member, _Token(json.dumps(key, ensure_ascii=False) + ":"))
+                    for key, member in members
+                ],
+                "}",
+            )
+        elif isinstance(item, (list, tuple)):
+            write("[")
+            _push_separated(stack, [(member,) for member in item], "]")
+        else:
+            scalar = _canonical_scalar(item)
+            if scalar is None:
+                stack.append(to_jsonable_python(item))
+            else:
+                write(scalar)
+
+
+def canonical_json(value: Any, exclude: Collection[str] = ()) -> bytes:
+    """Return value as RFC 8785 (JCS) canonical JSON bytes."""
+    buffer = []
+    write_canonical_json(value, buffer.append, exclude)
+    return "".join(buffer).encode()
+
+
+def canonical_digest(value: Any, exclude: Collection[str] = ()) -> str:
+    """Return the SHA-256 hex digest of the canonical JSON form of value."""
+    return hashlib.sha256(canonical_json(value, exclude)).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(cls: Type[ResourceType]) -> TypeAdapter:
+    """Return a cached adapter validating lists of a resource class."""
+    return TypeAdapter(List[cls])
+
+
 class Resource(BaseModel):
     """Base class for DID Document components."""
 
@@ -46,10 +190,34 @@ class Resource(BaseModel):
         alias_generator=alias_generators.to_camel,
     )
 
+    _digest: Optional[str] = None
+    _version: int = 0
+
+    def __setattr__(self, name: str, value: Any):
+        """Set attribute, discarding the cached digest and bumping the version."""
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self._digest = None
+            self._version += 1
+
     def serialize(self):
         """Return serialized representation of Resource."""
         return self.model_dump(exclude_none=True, by_alias=True)
 
+    def canonical_json(self) -> bytes:
+        """Return serialized Resource as RFC 8785 (JCS) canonical JSON."""
+        return canonical_json(self)
+
+    def digest(self) -> str:
+        """Return a stable digest of the serialized content of this resource.
+
+        The digest is cached until an attribute of the resource is assigned;
+        changes made in place to nested values are not detected.
+        """
+        if self._digest is None:
+            self._digest = canonical_digest(self)
+        return self._digest
+
     @classmethod
     def deserialize(cls: Type[ResourceType], value: dict) -> ResourceType:
         """Deserialize into Resource subtype."""
@@ -100,21 +268,57 @@ class Resource(BaseModel):
         kwargs = cls._overwrite_none_with_defaults(**kwargs)
         return cls(**kwargs)
 
+    @classmethod
+    def make_many(
+        cls: Type[ResourceType], values: Iterable[Dict[str, Any]]
+    ) -> List[ResourceType]:
+        """Create instances of class from keyword dicts, validated as a batch.
+
+        Literals and defaults are filled in as by make. If any value fails
+        validation, no instances are returned and the error reports the
+        position of each failing value.
+        """
+        literals = cls._fill_in_required_literals()
+        defaults = {
+            field.alias: field
+            for field in cls.model_fields.values()
+            if not field.is_required()
+        }
+        batch = []
+        for kwargs in values:
+            kwargs = dict(kwargs)
+            for name, literal in literals.items():
+                if kwargs.get(name) is None:
+                    kwargs[name] = literal
+            for name, value in kwargs.items():
+                if value is None and name in defaults:
+                    kwargs[name] = defaults[name].get_default()
+            batch.append(kwargs)
+        return _list_adapter(cls).validate_python(batch)
+
 
 class IndexedResource(Resource, ABC):
-    """Resource with index for supporting dereferencing nested objects."""
+    """Resource with index for supporting dereferencing nested objects.
 
-    _index: dict = {}
+    The index is built on the first dereference rather than on construction,
+    as many resources are never dereferenced. Call build_index to build it
+    eagerly.
+    """
 
-    def __init__(self, **data):
-        """Initialize Resource."""
-        super().__init__(**data)
-        self._index_resources()
+    _index: dict = {}
+    _indexed: bool = False
 
     @abstractmethod
     def _index_resources(self):
         """Index nested resources."""
 
+    def build_index(self):
+        """Build the index of nested resources if not already built."""
+        if not self._indexed:
+            self._index_resources()
+            self._indexed = True
+        return self
+
     @abstractmethod
     def dereference(self, reference: str) -> Resource:
         """Dereference a nested object."""
@@ -128,10 +332,3 @@ class IndexedResource(Resource, ABC):
             resource = self.dereference(reference)
             resource_adapter: TypeAdapter[ResourceType] = TypeAdapter(typ)
             return resource_adapter.validate_python(resource.model_dump())
-
-    @classmethod
-    def model_construct(cls, **data):
-        """Construct and index."""
-        resource = super(Resource, cls).model_construct(**data)
-        resource._index_resources()
-        return resource
@@ -1,15 +1,80 @@
 """DID Doc Service."""
 
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cached_property
 from typing import Any, List, Mapping, Optional, Union
 
-from pydantic import AnyUrl, ConfigDict, StrictStr
-from typing_extensions import Literal
+from pydantic import AnyUrl, ConfigDict, StrictStr, TypeAdapter, WrapValidator
+from typing_extensions import Annotated, Literal
 
 from .did import DID
 from .did_url import DIDUrl
 from .resource import Resource
 
-EndpointStrings = Union[DID, DIDUrl, AnyUrl, StrictStr]
+_LAZY_ENDPOINTS: ContextVar[bool] = ContextVar("lazy_endpoints", default=False)
+_URL_ADAPTER = TypeAdapter(AnyUrl)
+
+
+class LazyEndpoint(str):
+    """Service endpoint string validated on demand.
+
+    Endpoints are classified by prefix as a DID, a DID URL, a URL, or another
+    string. Parsing as a URL or DID URL happens only when url or did_url is
+    first accessed, and the result is cached.
+    """
+
+    @property
+    def kind(self) -> str:
+        """Return the kind of endpoint: did, did_url, url, or string."""
+        if self.startswith("did:"):
+            return "did_url" if any(char in self for char in "/?#") else "did"
+        if "://" in self:
+            return "url"
+        return "string"
+
+    @cached_property
+    def url(self) -> AnyUrl:
+        """Return endpoint parsed as a URL, raising ValueError if invalid."""
+        return _URL_ADAPTER.validate_python(str(self))
+
+    @cached_property
+    def did_url(self) -> DIDUrl:
+        """Return endpoint parsed as a DID URL, raising ValueError if invalid."""
+        return DIDUrl.parse(str(self))
+
+
+@contextmanager
+def lazy_endpoints(enabled: bool = True):
+    """Store string service endpoints validated within as LazyEndpoints.
+
+    >>> from pydid.service import Service, lazy_endpoints
+    >>> with lazy_endpoints():
+    ...     service = Service.deserialize(
+    ...         {"id": "#s", "type": "t", "serviceEndpoint": "https://example.com"}
+    ...     )
+    >>> service.service_endpoint.kind
+    'url'
+    >>> str(service.service_endpoint.url)
+    'https://example.com/'
+    """
+    token = _LAZY_ENDPOINTS.set(enabled)
+    try:
+        yield
+    finally:
+        _LAZY_ENDPOINTS.reset(token)
+
+
+def _validate_endpoint(value: Any, handler):
+    """Defer validation of string endpoints when lazy endpoints are enabled."""
+    if _LAZY_ENDPOINTS.get() and type(value) is str:
+        return LazyEndpoint(value)
+    return handler(value)
+
+
+EndpointStrings = Annotated[
+    Union[DID, DIDUrl, AnyUrl, StrictStr], WrapValidator(_validate_endpoint)
+]
 
 DIDCOMM_V1_TYPE_STRINGS = Literal["IndyAgent", "did-communication", "DIDCommMessaging"]
 DIDCOMM_V2_TYPE_STRINGS = Literal["DIDCommMessaging"]
@@ -26,6 +91,10 @@ class Service(Resource):
         Mapping[str, Any],
     ]
 
+    def key_references(self) -> List[DIDUrl]:
+        """Return the references to keys made by this service."""
+        return []
+
 
 class DIDCommV1Service(Service):
     """DID Communication Service."""
@@ -40,6 +109,10 @@ class DIDCommV1Service(Service):
     accept: Optional[List[str]] = None
     priority: int = 0
 
+    def key_references(self) -> List[DIDUrl]:
+        """Return the recipient and routing keys of this service."""
+        return list(self.recipient_keys) + list(self.routing_keys)
+
 
 DIDCommService = DIDCommV1Service
 
@@ -61,6 +134,13 @@ class DIDCommV2Service(Service):
     )
     service_endpoint: Union[List[DIDCommV2ServiceEndpoint], DIDCommV2ServiceEndpoint]
 
+    def key_references(self) -> List[DIDUrl]:
+        """Return the routing keys of the endpoints of this service."""
+        endpoints = self.service_endpoint
+        if not isinstance(endpoints, list):
+            endpoints = [endpoints]
+        return [key for endpoint in endpoints for key in endpoint.routing_keys]
+
 
 class UnknownService(Service):
     """Unknown Service."""
@@ -1,20 +1,128 @@
 """Validation tools and helpers."""
 
 from contextlib import contextmanager
-from typing import Set, Type
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Type
 
 from pydantic import ValidationError, ValidationInfo, model_validator
 
 
+class WrappedValidationError(ValueError):
+    """Validation error that renders its message only when requested.
+
+    The structured errors of the underlying pydantic ValidationError remain
+    available through errors() without formatting any text.
+    """
+
+    def __init__(self, error: ValidationError, message: Optional[str] = None):
+        """Initialize error."""
+        super().__init__(message)
+        self.validation_error = error
+        self.message = message
+        self._rendered: Optional[str] = None
+
+    def errors(self, **kwargs) -> List[Dict[str, Any]]:
+        """Return the structured validation errors."""
+        return self.validation_error.errors(**kwargs)
+
+    def error_count(self) -> int:
+        """Return the number of validation errors."""
+        return self.validation_error.error_count()
+
+    def __str__(self) -> str:
+        """Render the error message."""
+        if self._rendered is None:
+            rendered = str(self.validation_error)
+            self._rendered = (
+                ":\n".join([self.message, rendered]) if self.message else rendered
+            )
+        return self._rendered
+
+
+_wrapped_error_types: Dict[Type[Exception], Type[WrappedValidationError]] = {}
+
+
+def _wrapped_error_type(error_to_raise: Type[Exception]) -> Type[WrappedValidationError]:
+    """Return a WrappedValidationError that is also an instance of error_to_raise."""
+    if issubclass(WrappedValidationError, error_to_raise):
+        return WrappedValidationError
+    if error_to_raise not in _wrapped_error_types:
+        _wrapped_error_types[error_to_raise] = type(
+            error_to_raise.__name__,
+            (error_to_raise, WrappedValidationError),
+            {"__module__": error_to_raise.__module__, "__doc__": error_to_raise.__doc__},
+        )
+    return _wrapped_error_types[error_to_raise]
+
+
 @contextmanager
 def wrap_validation_error(error_to_raise: Type[Exception], message: str = None):
-    """Wrap validation errors with more friendly errors."""
+    """Wrap validation errors with more friendly errors.
+
+    The raised error is an instance of both error_to_raise and
+    WrappedValidationError; its message is rendered lazily.
+    """
     try:
         yield
     except ValidationError as error:
-        raise error_to_raise(
-            ":\n".join([message, str(error)]) if message else str(error)
-        ) from error
+        raise _wrapped_error_type(error_to_raise)(error, message) from error
+
+
+class LimitExceededError(ValueError):
+    """Raised when a raw document exceeds the configured limits."""
+
+
+class DocumentLimits(NamedTuple):
+    """Bounds on the shape of raw documents accepted for processing.
+
+    Depth counts nesting of lists and objects, the document itself being at
+    depth 1. Nodes counts every object, list, and value. Size counts the
+    characters of all object keys and string values. Limits left as None are
+    not enforced.
+    """
+
+    max_depth: Optional[int] = None
+    max_nodes: Optional[int] = None
+    max_size: Optional[int] = None
+
+
+# Sentinel marking the end of an iterator during iterative traversal
+_EXHAUSTED = object()
+
+
+def check_limits(value: Any, limits: DocumentLimits):
+    """Raise LimitExceededError if value exceeds limits.
+
+    The value is traversed iteratively and traversal stops as soon as a limit
+    is exceeded, so both time and memory are bounded by the limits.
+    """
+    max_depth, max_nodes, max_size = limits
+    nodes = 0
+    size = 0
+    stack = [(value, 1)]
+    while stack:
+        node, depth = stack.pop()
+        nodes += 1
+        if max_nodes is not None and nodes > max_nodes:
+            raise LimitExceededError(
+                "Document exceeds maximum of {} nodes".format(max_nodes)
+            )
+        if isinstance(node, str):
+            size += len(node)
+        elif isinstance(node, (dict, list)):
+            if max_depth is not None and depth > max_depth:
+                raise LimitExceededError(
+                    "Document exceeds maximum depth of {}".format(max_depth)
+                )
+            if isinstance(node, dict):
+                for key, item in node.items():
+                    size += len(key) if isinstance(key, str) else 0
+                    stack.append((item, depth + 1))
+            else:
+                stack.extend((item, depth + 1) for item in node)
+        if max_size is not None and size > max_size:
+            raise LimitExceededError(
+                "Document exceeds maximum size of {}".format(max_size)
+            )
 
 
 def required_group(props: Set[str]):
@@ -0,0 +1,58 @@
+"""Test DIDDocumentCollection."""
+
+import pytest
+
+from pydid.did_url import DIDUrl
+from pydid.doc.builder import DIDDocumentBuilder
+from pydid.doc.collection import DIDDocumentCollection
+from pydid.doc.doc import IDNotFoundError
+from pydid.verification_method import Ed25519VerificationKey2018
+
+
+def make_doc(did, material):
+    builder = DIDDocumentBuilder(did)
+    key = builder.verification_method.add(
+        Ed25519VerificationKey2018, public_key_base58=material
+    )
+    return builder, key
+
+
+def test_resolve_across_documents():
+    builder, key = make_doc("did:example:alice", "alice")
+    mediator, routing = make_doc("did:example:mediator", "mediator")
+    builder.service.add_didcomm_v1(
+        "https://example.com", [key], [routing.id, "did:example:other#key-0"]
+    )
+    alice = builder.build()
+    collection = DIDDocumentCollection([alice, mediator.build()])
+
+    resolution = collection.resolve_services(alice)
+    assert resolution.resolved == {key.id: key, routing.id: routing}
+    assert resolution.materials == {key.id: "alice", routing.id: "mediator"}
+    assert resolution.unresolved == ["did:example:other#key-0"]
+    with pytest.raises(IDNotFoundError) as excinfo:
+        resolution.raise_for_unresolved()
+    assert "did:example:other#key-0" in str(excinfo.value)
+
+
+def test_resolve_relative_and_invalid():
+    alice, key = make_doc("did:example:alice", "alice")
+    collection = DIDDocumentCollection([alice.build()])
+    resolution = collection.resolve(
+        ["#key-0", DIDUrl.parse("#key-0"), "#key-1", "not a reference"],
+        base="did:example:alice",
+    )
+    assert list(resolution.resolved) == ["did:example:alice#key-0"]
+    assert resolution.unresolved == ["did:example:alice#key-1", "not a reference"]
+    assert collection.resolve(["#key-0"]).unresolved == ["#key-0"]
+
+
+def test_collection_follows_document_changes():
+    builder, key = make_doc("did:example:alice", "alice")
+    doc = builder.build()
+    collection = DIDDocumentCollection([doc])
+    assert "did:example:alice" in collection
+    doc.verification_method.remove(key)
+    assert collection.resolve([key.id]).unresolved == [key.id]
+    collection.remove("did:example:alice")
+    assert len(collection) == 0
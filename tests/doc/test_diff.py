@@ -0,0 +1,89 @@
+"""Test document diffs and patches."""
+
+import copy
+
+import pytest
+
+from pydid.doc.diff import diff_documents, patch_document
+from pydid.doc.doc import DIDDocument
+
+from .test_doc import DOC6, DOCS
+
+
+def test_diff_identical():
+    old = DIDDocument.deserialize(DOC6)
+    new = DIDDocument.deserialize(DOC6)
+    diff = diff_documents(old, new)
+    assert diff.is_empty
+    assert patch_document(old, diff).serialize() == DOC6
+
+
+def test_diff_and_patch():
+    old_raw = copy.deepcopy(DOC6)
+    new_raw = copy.deepcopy(DOC6)
+    new_raw["verificationMethod"].append(
+        {
+            "id": "did:example:123#key-1",
+            "type": "Ed25519VerificationKey2018",
+            "controller": "did:example:123",
+            "publicKeyBase58": "5678",
+        }
+    )
+    new_raw["authentication"][1]["publicKeyBase58"] = "efgh"
+    new_raw["authentication"].reverse()
+    del new_raw["service"]
+    new_raw["alsoKnownAs"] = ["https://example.com"]
+    new_raw["extra"] = "value"
+
+    old = DIDDocument.deserialize(old_raw)
+    new = DIDDocument.deserialize(new_raw)
+    diff = diff_documents(old, new)
+    assert diff.fields == {
+        "also_known_as": ["https://example.com"],
+        "extra": "value",
+    }
+    assert set(diff.sections) == {"verification_method", "authentication", "service"}
+    assert list(diff.sections["verification_method"].added) == [
+        ("resource", "did:example:123#key-1")
+    ]
+    assert diff.sections["service"].order is None
+    assert diff.changed_ids() == {
+        "did:example:123#key-1",
+        "did:example:123#auth-0",
+        "did:example:123#service-0",
+    }
+
+    patched = patch_document(old, diff)
+    assert patched.serialize() == new_raw
+    assert patched.verification_method[0] is old.verification_method[0]
+    assert patched.authentication[1] == old.authentication[0]
+    assert patched.dereference("#key-1") is new.verification_method[1]
+    assert old.serialize() == old_raw
+
+
+def test_diff_removed_extra():
+    old_raw = copy.deepcopy(DOC6)
+    old_raw["extra"] = "value"
+    old = DIDDocument.deserialize(old_raw)
+    new = DIDDocument.deserialize(DOC6)
+    diff = diff_documents(old, new)
+    assert diff.removed_fields == ["extra"]
+    assert patch_document(old, diff).serialize() == DOC6
+
+
+@pytest.mark.parametrize("old_raw", DOCS)
+@pytest.mark.parametrize("new_raw", DOCS)
+def test_patch_round_trip(old_raw, new_raw):
+    old = DIDDocument.deserialize(old_raw)
+    new = DIDDocument.deserialize(new_raw)
+    assert patch_document(old, diff_documents(old, new)).serialize() == new.serialize()
+
+
+def test_patch_x():
+    old = DIDDocument.deserialize(DOC6)
+    new_raw = copy.deepcopy(DOC6)
+    del new_raw["service"][0]
+    diff = diff_documents(old, DIDDocument.deserialize(new_raw))
+    empty = DIDDocument.deserialize({"id": "did:example:123", "service": []})
+    with pytest.raises(ValueError):
+        patch_document(empty, diff)
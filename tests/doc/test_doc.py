@@ -2,22 +2,27 @@
 
 import copy
 from collections import namedtuple
+from collections.abc import MutableSequence
 
 import pytest
 from typing_extensions import Annotated, Literal
 
+from pydid import deserialize_document
 from pydid.did_url import DIDUrl, InvalidDIDUrlError
 from pydid.doc.builder import DIDDocumentBuilder
 from pydid.doc.doc import (
     DIDDocument,
     DIDDocumentError,
     DIDDocumentRoot,
+    IdentifiedResourceMismatch,
     IDNotFoundError,
     NonconformantDocument,
 )
+from pydid.resource import Resource
 from pydid.service import DIDCommV1Service, DIDCommV2Service, Service
 from pydid.verification_method import (
     Ed25519VerificationKey2018,
+    JsonWebKey2020,
     VerificationMaterial,
     VerificationMethod,
 )
@@ -441,7 +446,19 @@ def test_validate(doc):
 def test_fails_invalid(doc):
     """Test invalid docs fail."""
     with pytest.raises((ValueError, DIDDocumentError)):
-        DIDDocument.deserialize(doc)
+        DIDDocument.deserialize(doc).build_index()
+
+
+@pytest.mark.parametrize("doc", INVALID_DOCS)
+def test_deserialize_document_strict_fails_invalid(doc):
+    with pytest.raises((ValueError, DIDDocumentError)):
+        deserialize_document(doc, strict=True)
+
+
+def test_deserialize_document_mismatch_falls_back():
+    doc = deserialize_document(INVALID_DOC2)
+    assert isinstance(doc, NonconformantDocument)
+    assert doc.serialize()["authentication"] == INVALID_DOC2["authentication"]
 
 
 @pytest.mark.parametrize("doc_raw", DOCS)
@@ -535,6 +552,61 @@ def test_programmatic_construction():
     assert builder.build().serialize() == DOC6
 
 
+def test_programmatic_construction_add_many():
+    builder = DIDDocumentBuilder("did:example:123")
+    vmethods = builder.verification_method.add_many(
+        [Ed25519VerificationKey2018, JsonWebKey2020],
+        idents=[None, "jwk"],
+        public_key_base58=["1234", None],
+        public_key_jwk=[None, {"kty": "OKP", "crv": "Ed25519", "x": "abcd"}],
+    )
+    assert [vmethod.id for vmethod in vmethods] == [
+        "did:example:123#key-0",
+        "did:example:123#jwk",
+    ]
+    assert isinstance(vmethods[1], JsonWebKey2020)
+    services = builder.service.add_many(
+        "example", ["https://example.com", "https://example.org"], accept=[["a"], None]
+    )
+    assert [service.id for service in services] == [
+        "did:example:123#service-0",
+        "did:example:123#service-1",
+    ]
+    doc = builder.build()
+    assert doc.verification_method == vmethods
+    assert doc.service == services
+
+
+def test_programmatic_construction_add_many_reserves_idents():
+    builder = DIDDocumentBuilder("did:example:123")
+    vmethods = builder.verification_method.add_many(
+        Ed25519VerificationKey2018,
+        idents=["key-1", None, None],
+        public_key_base58=["1234", "5678", "abcd"],
+    )
+    assert [vmethod.id.fragment for vmethod in vmethods] == ["key-1", "key-0", "key-2"]
+    services = builder.service.add_many(
+        "example",
+        ["https://example.com", "https://example.org"],
+        idents=[None, "service-0"],
+    )
+    assert [service.id.fragment for service in services] == ["service-1", "service-0"]
+    doc = builder.build(validate=True)
+    assert len(doc.verification_method) == 3
+
+
+def test_programmatic_construction_add_many_x():
+    builder = DIDDocumentBuilder("did:example:123")
+    with pytest.raises(ValueError):
+        builder.verification_method.add_many(
+            Ed25519VerificationKey2018, public_key_base58=["1234", 1234]
+        )
+    with pytest.raises(ValueError):
+        builder.service.add_many("example", ["https://example.com"], accept=[])
+    assert not builder.verification_method.methods
+    assert not builder.service.services
+
+
 def test_programmatic_construction_didcomm():
     builder = DIDDocumentBuilder("did:example:123")
     key = builder.verification_method.add(
@@ -773,6 +845,228 @@ def test_builder_from_doc_remove():
     assert "assertionMethod" not in builder.build().serialize()
 
 
+def test_builder_remove_by_id():
+    doc = DIDDocument.deserialize(DOC6)
+    builder = DIDDocumentBuilder.from_doc(doc)
+    builder.verification_method.remove("did:example:123#key-0")
+    builder.authentication.remove(DIDUrl.parse("#key-0"))
+    builder.authentication.remove(DIDUrl.parse("#auth-0"))
+    builder.service.remove(doc.service[0].id)
+    assert builder.build().serialize() == {
+        "@context": ["https://www.w3.org/ns/did/v1"],
+        "id": "did:example:123",
+    }
+    with pytest.raises(ValueError):
+        builder.service.remove("did:example:123#service-0")
+    assert len(doc.verification_method) == 1
+
+
+def test_builder_generated_ids_skip_taken():
+    builder = DIDDocumentBuilder("did:example:123")
+    builder.verification_method.add(
+        ExampleVerificationMethod, ident="key-1", public_key_example="1234"
+    )
+    vmethods = [
+        builder.verification_method.add(
+            ExampleVerificationMethod, public_key_example="1234"
+        )
+        for _ in range(2)
+    ]
+    assert [vmethod.id.fragment for vmethod in vmethods] == ["key-2", "key-3"]
+    assert builder.verification_method.methods.get("#key-2") is vmethods[0]
+
+
+def test_builder_priority_without_didcomm_v1():
+    builder = DIDDocumentBuilder("did:example:123")
+    builder.service.add("example", "https://example.com")
+    first = builder.service.add_didcomm_v1("https://example.com", ["#key-0"])
+    second = builder.service.add_didcomm_v1("https://example.com", ["#key-0"])
+    assert (first.priority, second.priority) == (0, 1)
+    builder.service.remove(second)
+    assert builder.service._determine_next_priority() == 1
+    builder.service.remove(first)
+    assert builder.service._determine_next_priority() == 0
+
+
+def test_builder_items_list_operations():
+    builder = DIDDocumentBuilder("did:example:123")
+    keys = [
+        builder.verification_method.add(
+            ExampleVerificationMethod, public_key_example=str(index)
+        )
+        for index in range(5)
+    ]
+    methods = builder.verification_method.methods
+    builder.verification_method.remove(keys[1])
+    assert methods[1] is keys[2]
+    assert methods[-1] is keys[4]
+    assert methods[1:3] == [keys[2], keys[3]]
+    assert methods.index("#key-3") == 2
+    assert methods.pop() is keys[4]
+    assert methods.pop(0) is keys[0]
+    methods.insert(0, keys[1])
+    assert methods == [keys[1], keys[2], keys[3]]
+    methods[1] = keys[4]
+    assert "#key-2" not in methods
+    assert methods.get("#key-4") is keys[4]
+    del methods[0]
+    assert methods == [keys[4], keys[3]]
+    methods.reverse()
+    methods[1:] = [keys[0], keys[1]]
+    assert methods == [keys[3], keys[0], keys[1]]
+    assert methods.count(keys[0]) == 1
+    del methods[:2]
+    assert methods == [keys[1]]
+    with pytest.raises(IndexError):
+        methods[5] = keys[0]
+    methods.clear()
+    assert not methods
+    assert methods.resources == 0
+
+
+def test_builder_priority_after_direct_changes():
+    builder = DIDDocumentBuilder("did:example:123")
+    first = builder.service.add_didcomm_v1("https://example.com", ["#key-0"])
+    second = builder.service.add_didcomm_v1("https://example.com", ["#key-0"])
+    builder.service.services.pop()
+    assert builder.service._determine_next_priority() == 1
+    builder.service.services[0] = second
+    assert builder.service._determine_next_priority() == 2
+    builder.service.remove(second)
+    builder.service.services.insert(0, first)
+    assert builder.service._determine_next_priority() == 1
+
+
+def test_builder_from_doc_copy_on_write():
+    doc = DIDDocument.deserialize(DOC6).build_index()
+    builder = DIDDocumentBuilder.from_doc(doc)
+    assert builder.verification_method.methods.source is doc.verification_method
+    assert builder.service.services.source is doc.service
+
+    added = builder.verification_method.add(
+        ExampleVerificationMethod, public_key_example="1234"
+    )
+    builder.authentication.remove(DIDUrl.parse("#auth-0"))
+    assert builder.verification_method.methods.source is None
+    assert builder.service.services.source is doc.service
+    assert len(doc.verification_method) == 1
+    assert len(doc.authentication) == 2
+
+    built = builder.build()
+    assert built._indexed
+    assert built.service is not doc.service
+    assert built.dereference("#service-0") is doc.dereference("#service-0")
+    assert built.dereference(added.id) is added
+    with pytest.raises(IDNotFoundError):
+        built.dereference("#auth-0")
+    reindexed = DIDDocument.deserialize(built.serialize()).build_index()
+    assert built._index.keys() == reindexed._index.keys()
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        lambda items, ref: items.insert(0, ref),
+        lambda items, ref: items.__setitem__(slice(0, 1), [ref]),
+        lambda items, ref: items.__delitem__(slice(0, 1)),
+        lambda items, ref: items.sort(key=str, reverse=True),
+        lambda items, ref: items.reverse(),
+        lambda items, ref: items.__imul__(2),
+    ],
+)
+def test_builder_from_doc_copy_on_write_list_operations(operation):
+    doc = DIDDocument.deserialize(DOC6).build_index()
+    builder = DIDDocumentBuilder.from_doc(doc)
+    methods = builder.authentication.methods
+    expected = list(methods)
+    ref = DIDUrl.parse("did:example:123#key-0")
+    operation(methods, ref)
+    operation(expected, ref)
+    assert methods.source is None
+    assert list(methods) == expected
+    assert len(methods) == len(expected)
+    assert [methods[index] for index in range(len(methods))] == expected
+    assert builder.build().authentication == expected
+    assert len(doc.authentication) == 2
+
+
+def test_builder_items_sequence_protocol():
+    builder = DIDDocumentBuilder("did:example:123")
+    key = builder.verification_method.add(
+        ExampleVerificationMethod, public_key_example="1234"
+    )
+    methods = builder.verification_method.methods
+    assert isinstance(methods, MutableSequence)
+    assert methods + [None] == [key, None]
+    assert [None] + methods == [None, key]
+    assert methods * 2 == 2 * methods == [key, key]
+    assert methods.copy() == [key]
+    assert methods.copy() is not methods.copy()
+    assert list(reversed(methods)) == [key]
+    methods.append(DIDUrl.parse("#other"))
+    methods.append(key)
+    methods[0] = DIDUrl.parse("#key-0")
+    assert methods.index(key) == 2
+    assert methods.get("#key-0") is methods[0]
+
+
+def test_builder_from_unindexed_doc():
+    doc = DIDDocument.deserialize(DOC6)
+    built = DIDDocumentBuilder.from_doc(doc).build()
+    assert not built._indexed
+    assert built.serialize() == doc.serialize()
+    assert built.dereference("#key-0") is doc.verification_method[0]
+
+
+def test_build_validate():
+    builder = DIDDocumentBuilder("did:example:123")
+    key = builder.verification_method.add(
+        Ed25519VerificationKey2018, public_key_base58="1234"
+    )
+    builder.authentication.reference(key.id)
+    builder.authentication.reference(DIDUrl.parse("did:example:456#key-0"))
+    builder.service.add_didcomm_v1("https://example.com", [key], ["#key-0"])
+    doc = builder.build(validate=True)
+    assert doc._indexed
+    assert builder._validated.keys() == {id(key), id(doc.service[0])}
+
+    builder.assertion_method.reference(DIDUrl.parse("#missing"))
+    builder.service.add_didcomm_v2("https://example.com", [key], ["#routing"])
+    with pytest.raises(IDNotFoundError) as excinfo:
+        builder.build(validate=True)
+    assert "did:example:123#missing" in str(excinfo.value)
+    assert "did:example:123#routing" in str(excinfo.value)
+
+
+def test_build_validate_changed_items():
+    builder = DIDDocumentBuilder("did:example:123")
+    key = builder.verification_method.add(
+        Ed25519VerificationKey2018, public_key_base58="1234"
+    )
+    builder.build(validate=True)
+    assert builder._validated[id(key)] == (key, key._version)
+
+    key.public_key_base58 = 1234
+    with pytest.raises(ValueError):
+        builder.build(validate=True)
+    builder.verification_method.remove(key)
+    builder.build(validate=True)
+    assert not builder._validated
+
+
+def test_build_validate_changed_items_after_digest():
+    builder = DIDDocumentBuilder("did:example:123")
+    key = builder.verification_method.add(
+        Ed25519VerificationKey2018, public_key_base58="1234"
+    )
+    doc = builder.build(validate=True)
+    key.controller = 12345
+    doc.digest()
+    key.digest()
+    with pytest.raises(ValueError):
+        builder.build(validate=True)
+
+
 def test_key_rotation_from_doc():
     doc = DIDDocument.deserialize(DOC6)
     vmethod0 = doc.dereference("did:example:123#key-0")
@@ -898,3 +1192,361 @@ def test_default_context_should_not_mutate():
 
     # then
     assert DIDDocumentBuilder("did:example:123").context == original_default_context
+
+
+def test_salvage_keeps_valid_items():
+    doc_raw = copy.deepcopy(DOC0)
+    bad_method = {"id": "#bad", "type": "Ed25519VerificationKey2018"}
+    doc_raw["authentication"].append(bad_method)
+    doc = DIDDocument.salvage(doc_raw)
+    assert isinstance(doc.authentication[0], Ed25519VerificationKey2018)
+    assert doc.authentication[1] == bad_method
+    assert [diag.path for diag in doc.diagnostics] == [("authentication", 1)]
+    assert doc.is_nonconformant
+    assert doc.dereference(DOC0["authentication"][0]["id"])
+    assert doc.serialize() == doc_raw
+
+
+def test_salvage_top_level():
+    doc_raw = copy.deepcopy(DOC0)
+    doc_raw["controller"] = {"not": "a did"}
+    doc = DIDDocument.salvage(doc_raw)
+    assert doc.controller == {"not": "a did"}
+    assert [diag.path for diag in doc.diagnostics] == [("controller",)]
+    assert isinstance(doc.service[0], Service)
+
+
+def test_salvage_section_not_list():
+    doc_raw = copy.deepcopy(DOC0)
+    doc_raw["verificationMethod"] = "garbage"
+    doc = DIDDocument.salvage(doc_raw)
+    assert doc.verification_method is None
+    assert [diag.path for diag in doc.diagnostics] == [("verificationMethod",)]
+    assert doc.dereference(DOC0["authentication"][0]["id"])
+    with pytest.raises(IDNotFoundError):
+        doc.dereference("#g")
+    assert doc.serialize() == doc_raw
+
+
+def test_salvage_valid_doc():
+    doc = DIDDocument.salvage(DOC0)
+    assert not doc.diagnostics
+    assert doc.is_conformant
+    assert doc.serialize() == DIDDocument.deserialize(DOC0).serialize()
+
+
+def test_salvage_x():
+    with pytest.raises(ValueError):
+        DIDDocument.salvage({"id": "bogus"})
+
+
+@pytest.mark.parametrize("cls", [DIDDocument, NonconformantDocument])
+def test_dereference_without_parsing(cls, monkeypatch):
+    doc = cls.deserialize(DOC6)
+
+    def _fail(*args):
+        raise AssertionError("Reference should not be parsed")
+
+    monkeypatch.setattr(DIDUrl, "parse", _fail)
+    vmethod = doc.dereference("did:example:123#key-0")
+    assert doc.dereference("#key-0") is vmethod
+    assert doc.dereference(DIDUrl("did:example:123#key-0")) is vmethod
+    assert doc.dereference("#service-0") is doc.dereference("did:example:123#service-0")
+
+
+def test_find_methods():
+    doc = DIDDocument.deserialize(DOC6)
+    key0 = doc.dereference("#key-0")
+    auth0 = doc.dereference("#auth-0")
+    assert doc.find_methods() == [key0, auth0]
+    assert doc.find_methods(type="Ed25519VerificationKey2018") == [key0, auth0]
+    assert doc.find_methods(relationship="authentication") == [key0, auth0]
+    assert doc.find_methods(relationship="keyAgreement") == []
+    assert doc.find_methods(material="abcd") == [auth0]
+    assert doc.find_methods(
+        material="1234",
+        material_property="publicKeyBase58",
+        relationship="authentication",
+    ) == [key0]
+    assert doc.find_methods(material_property="public_key_multibase") == []
+    assert doc.find_methods(controller="did:example:123", type="Example") == []
+    assert doc.query_index is doc.query_index
+
+
+def test_find_methods_jwk():
+    builder = DIDDocumentBuilder("did:example:123")
+    jwk = {"kty": "OKP", "crv": "Ed25519", "x": "abcd"}
+    vmethod = builder.key_agreement.embed(
+        ExampleVerificationMethod, public_key_example="1234", public_key_jwk=None
+    )
+    other = builder.verification_method.add(
+        JsonWebKey2020, public_key_jwk=jwk, ident="jwk"
+    )
+    doc = builder.build()
+    assert doc.find_methods(material=dict(jwk)) == [other]
+    assert doc.find_methods(relationship="key_agreement") == [vmethod]
+
+
+def test_find_methods_relationship_document_order():
+    builder = DIDDocumentBuilder("did:example:123")
+    keys = [
+        builder.verification_method.add(
+            ExampleVerificationMethod, public_key_example=str(index)
+        )
+        for index in range(3)
+    ]
+    for key in reversed(keys):
+        builder.authentication.reference(key.id)
+    doc = builder.build()
+    assert doc.find_methods(relationship="authentication") == keys
+    assert doc.find_methods(relationship="authentication", type="Example") == keys
+
+
+def test_find_methods_suite_material():
+    suite = VerificationMethod.suite("FindSuite", "publicKeyFindSuite", str)
+    builder = DIDDocumentBuilder("did:example:123")
+    vmethod = builder.verification_method.add(suite, public_key_find_suite="1234")
+    builder.verification_method.add(Ed25519VerificationKey2018, public_key_base58="5678")
+    doc = builder.build()
+    assert doc.find_methods(material="1234") == [vmethod]
+    assert doc.find_methods(material="1234", material_property="publicKeyFindSuite") == [
+        vmethod
+    ]
+
+
+def test_find_services():
+    doc = DIDDocument.deserialize(DOC9)
+    assert doc.find_services(type="did-communication") == doc.service
+    assert doc.find_services(type="example") == []
+    assert doc.find_services() == doc.service
+
+
+def test_resolve_relationship():
+    doc_raw = copy.deepcopy(DOC6)
+    doc_raw["authentication"].extend(["#key-0", "#missing", "did:example:other#key-0"])
+    doc = DIDDocument.deserialize(doc_raw)
+    resolved = doc.resolve_relationship("authentication")
+    assert resolved.methods == [doc.dereference("#key-0"), doc.dereference("#auth-0")]
+    assert resolved.missing == ["did:example:123#missing"]
+    assert resolved.external == ["did:example:other#key-0"]
+    assert doc.resolve_relationship("keyAgreement").methods == []
+    assert doc.resolve_relationship("authentication") is resolved
+    with pytest.raises(ValueError):
+        doc.resolve_relationship("service")
+
+
+def test_didcomm_endpoints():
+    builder = DIDDocumentBuilder("did:example:123")
+    key = builder.verification_method.add(
+        Ed25519VerificationKey2018, public_key_base58="1234"
+    )
+    agreement = builder.key_agreement.embed(
+        Ed25519VerificationKey2018, public_key_base58="abcd"
+    )
+    external = DIDUrl.parse("did:example:456#key-0")
+    builder.service.add_didcomm_v1("https://example.com/1", [key], priority=2)
+    builder.service.add_didcomm_v1("https://example.com/0", [key], [external], priority=1)
+    builder.service.add_didcomm_v2(
+        "https://example.com/2", [key], [key], accept=["didcomm/v2"]
+    )
+    builder.service.add("example", "https://example.com")
+    doc = builder.build()
+
+    endpoints = doc.didcomm_endpoints()
+    assert [endpoint.uri for endpoint in endpoints] == [
+        "https://example.com/2",
+        "https://example.com/0",
+        "https://example.com/1",
+    ]
+    v2, v1 = endpoints[0], endpoints[1]
+    assert v2.recipient_keys == [agreement]
+    assert v2.routing_keys[0] is key
+    assert v1.recipient_keys[0] is key
+    assert v1.routing_keys == [external]
+    assert doc.didcomm_endpoints(version=2) == [v2]
+    assert doc.didcomm_endpoints(accept="didcomm/v2") == endpoints
+    assert doc.didcomm_endpoints(accept=["didcomm/aip2"]) == endpoints[1:]
+    assert doc.query_index.didcomm is doc.query_index.didcomm
+
+    doc.service.pop(0)
+    assert len(doc.didcomm_endpoints()) == 2
+
+
+def test_section_identity_kept_when_indexed():
+    doc = DIDDocument.deserialize(DOC6)
+    vmethods = doc.verification_method
+    doc.dereference("#key-0")
+    assert vmethods is doc.verification_method
+    vmethod = Ed25519VerificationKey2018.make(
+        id="did:example:123#key-1", controller="did:example:123", public_key_base58="x"
+    )
+    vmethods.append(vmethod)
+    assert len(doc.verification_method) == 2
+    assert doc.dereference("#key-1") is vmethod
+
+    builder = DIDDocumentBuilder.from_doc(doc)
+    builder.verification_method.remove(vmethod)
+    built = builder.build()
+    services = built.service
+    built.dereference("#service-0")
+    assert services is built.service
+
+    constructed = DIDDocument.model_construct(
+        id="did:example:123", service=list(doc.service)
+    )
+    services = constructed.service
+    assert constructed.dereference("#service-0")
+    assert services is constructed.service
+
+
+def test_index_follows_section_mutation():
+    doc = DIDDocument.deserialize(DOC6)
+    vmethod = Ed25519VerificationKey2018.make(
+        id="did:example:123#key-1", controller="did:example:123", public_key_base58="x"
+    )
+    doc.verification_method.append(vmethod)
+    assert doc.dereference("#key-1") is vmethod
+    assert vmethod in doc.find_methods()
+
+    doc.verification_method.remove(vmethod)
+    with pytest.raises(IDNotFoundError):
+        doc.dereference("#key-1")
+
+    doc.verification_method[0] = vmethod
+    assert doc.dereference("#key-1") is vmethod
+    with pytest.raises(IDNotFoundError):
+        doc.dereference("#key-0")
+
+    del doc.verification_method[0]
+    assert doc.verification_method == []
+
+
+def test_index_unchanged_by_rejected_slice_assignment():
+    doc = DIDDocument.deserialize(DOC6).build_index()
+    doc.verification_method.extend(
+        Ed25519VerificationKey2018.make(
+            id="did:example:123#key-{}".format(index),
+            controller="did:example:123",
+            public_key_base58="x",
+        )
+        for index in (1, 2)
+    )
+    vmethod = Ed25519VerificationKey2018.make(
+        id="did:example:123#new", controller="did:example:123", public_key_base58="y"
+    )
+    with pytest.raises(ValueError):
+        doc.verification_method[::2] = [vmethod]
+    assert len(doc.verification_method) == 3
+    assert doc.dereference("#key-0") is doc.verification_method[0]
+    with pytest.raises(IDNotFoundError):
+        doc.dereference("#new")
+
+
+def test_index_follows_section_assignment():
+    doc = DIDDocument.deserialize(DOC6)
+    service = Service.make(
+        id="did:example:123#service-1", type="example", service_endpoint="x"
+    )
+    doc.service = [service]
+    assert doc.dereference("#service-1") is service
+    with pytest.raises(IDNotFoundError):
+        doc.dereference("#service-0")
+    doc.service.append(doc.dereference("#service-1"))
+    doc.service.pop()
+    assert doc.dereference("#service-1") is service
+    doc.service = None
+    with pytest.raises(IDNotFoundError):
+        doc.dereference("#service-1")
+
+
+def test_index_shared_ids():
+    doc = DIDDocument.deserialize(DOC6)
+    vmethod = doc.dereference("#auth-0")
+    doc.verification_method.append(vmethod)
+    doc.authentication.pop()
+    assert doc.dereference("#auth-0") is vmethod
+    doc.verification_method.pop()
+    with pytest.raises(IDNotFoundError):
+        doc.dereference("#auth-0")
+
+
+def test_index_mutation_mismatch():
+    doc = DIDDocument.deserialize(DOC6).build_index()
+    conflicting = Ed25519VerificationKey2018.make(
+        id="did:example:123#key-0", controller="did:example:123", public_key_base58="x"
+    )
+    with pytest.raises(IdentifiedResourceMismatch):
+        doc.authentication.append(conflicting)
+    with pytest.raises(IdentifiedResourceMismatch):
+        doc.authentication = [conflicting]
+    assert conflicting not in doc.authentication
+    assert doc.dereference("#auth-0")
+    assert doc.dereference("#key-0").public_key_base58 == "1234"
+
+
+def test_copied_doc_index_independent():
+    doc = DIDDocument.deserialize(DOC6)
+    copies = [copy.copy(doc), copy.deepcopy(doc), doc.model_copy(deep=True)]
+    doc.build_index()
+    copies += [copy.copy(doc), copy.deepcopy(doc), doc.model_copy(deep=True)]
+    for copied in copies:
+        copied.service.clear()
+        with pytest.raises(IDNotFoundError):
+            copied.dereference("#service-0")
+        assert doc.dereference("#service-0")
+
+
+def test_index_deferred():
+    doc = DIDDocument.deserialize(DOC6)
+    assert not doc._indexed
+    assert doc.serialize() == DOC6
+    doc.verification_method.append(doc.authentication[1])
+    assert not doc._indexed
+    assert doc.dereference("#auth-0")
+    assert doc._indexed
+    assert doc.build_index() is doc
+
+
+def test_index_deferred_mismatch():
+    doc = DIDDocument.deserialize(DOC6)
+    doc.authentication.append(
+        Ed25519VerificationKey2018.make(
+            id="did:example:123#key-0",
+            controller="did:example:123",
+            public_key_base58="x",
+        )
+    )
+    with pytest.raises(IdentifiedResourceMismatch):
+        doc.dereference("#key-0")
+    doc.authentication.pop()
+    assert doc.dereference("#key-0")
+
+
+def test_nonconformant_dereference_wraps_lazily():
+    doc = NonconformantDocument.deserialize(DOC6).build_index()
+    assert isinstance(doc._index["#key-0"], dict)
+    resource = doc.dereference("#key-0")
+    assert isinstance(resource, Resource)
+    assert resource.serialize() == DOC6["verificationMethod"][0]
+    assert doc.dereference("did:example:123#key-0") is resource
+
+
+def test_document_digest():
+    doc = DIDDocument.deserialize(DOC6)
+    digest = doc.digest()
+    assert digest == DIDDocument.deserialize(copy.deepcopy(DOC6)).digest()
+    assert digest == NonconformantDocument.deserialize(DOC6).digest()
+
+    vmethod = doc.verification_method[0]
+    vmethod_digest = vmethod.digest()
+    doc.service[0].service_endpoint = "https://example.org"
+    assert doc.digest() != digest
+    assert vmethod.digest() is vmethod_digest
+
+    doc.service[0].service_endpoint = "https://example.com"
+    assert doc.digest() == digest
+    doc.also_known_as = ["https://example.com"]
+    assert doc.digest() != digest
+    doc.also_known_as = None
+    doc.authentication.pop()
+    assert doc.digest() != digest
@@ -0,0 +1,68 @@
+"""Test DocumentTemplate."""
+
+import pytest
+
+from pydid.doc.builder import DIDDocumentBuilder
+from pydid.doc.doc import DIDDocument
+from pydid.doc.template import DocumentTemplate
+from pydid.verification_method import Ed25519VerificationKey2018, JsonWebKey2020
+
+
+@pytest.fixture
+def template():
+    builder = DIDDocumentBuilder("did:example:123")
+    key = builder.verification_method.add(
+        Ed25519VerificationKey2018, public_key_base58="abcd"
+    )
+    builder.authentication.reference(key.id)
+    builder.key_agreement.embed(JsonWebKey2020, public_key_jwk={"kty": "OKP"})
+    builder.service.add_didcomm_v1("https://example.com/v1", [key])
+    builder.service.add_didcomm_v2("https://example.com/v2", [key], [key])
+    builder.service.add("LinkedDomains", "https://example.com", ident="web")
+    yield DocumentTemplate.from_builder(builder)
+
+
+def test_instantiate(template):
+    doc = template.instantiate(
+        "did:example:456",
+        materials={"key-0": "efgh"},
+        endpoints={"service-1": "https://example.org/v2", "web": "https://example.org"},
+    )
+    assert isinstance(doc, DIDDocument)
+    assert doc.id == "did:example:456"
+    key = doc.dereference("#key-0")
+    assert key.public_key_base58 == "efgh"
+    assert key.controller == "did:example:456"
+    assert doc.authentication == ["did:example:456#key-0"]
+    assert doc.authentication[0].fragment == "key-0"
+    assert doc.key_agreement[0].public_key_jwk == {"kty": "OKP"}
+    assert doc.key_agreement[0].material == {"kty": "OKP"}
+    assert doc.service[0].recipient_keys == ["did:example:456#key-0"]
+    assert doc.service[1].service_endpoint.uri == "https://example.org/v2"
+    assert doc.service[1].service_endpoint.routing_keys == ["did:example:456#key-0"]
+    assert doc.service[2].service_endpoint == "https://example.org"
+    assert DIDDocument.deserialize(doc.serialize()).serialize() == doc.serialize()
+
+
+def test_render_matches_instantiate(template):
+    params = (
+        "did:example:456",
+        {"key-0": "efgh", "key-agreement-0": {"kty": "EC"}},
+        {"service-0": "https://example.org/v1", "service-1": "https://example.org/v2"},
+    )
+    assert template.render(*params) == template.instantiate(*params).serialize()
+
+
+def test_instances_independent(template):
+    first = template.instantiate("did:example:456")
+    second = template.instantiate("did:example:789")
+    first.authentication.append(first.verification_method[0].id)
+    assert len(second.authentication) == 1
+    assert second.service[0].recipient_keys == ["did:example:789#key-0"]
+
+
+def test_instantiate_x(template):
+    with pytest.raises(ValueError):
+        template.instantiate("did:example:456", materials={"unknown": "efgh"})
+    with pytest.raises(ValueError):
+        template.instantiate("not a did")
@@ -2,6 +2,7 @@
 
 import json
 import logging
+import sys
 from pathlib import Path
 
 import pytest
@@ -44,3 +45,119 @@ def test_corrections():
         ],
     }
     pydid.deserialize_document(doc_raw, corrections=[corrections.insert_missing_ids])
+
+
+@pytest.mark.parametrize("value", DOCS)
+def test_salvage_doc_deserialization(value):
+    doc = pydid.deserialize_document(value, salvage=True)
+    assert doc.is_conformant == (not doc.diagnostics)
+    if doc.is_conformant:
+        pydid.deserialize_document(value, strict=True)
+
+
+def test_salvage_unsupported_cls_x():
+    with pytest.raises(ValueError, match="does not support salvage"):
+        pydid.deserialize_document(DOCS[0], salvage=True, cls=pydid.NonconformantDocument)
+
+
+@pytest.mark.parametrize(
+    "limits",
+    [
+        pydid.DocumentLimits(max_depth=3),
+        pydid.DocumentLimits(max_nodes=10),
+        pydid.DocumentLimits(max_size=100),
+    ],
+)
+def test_deserialize_limits_x(limits):
+    doc_raw = {
+        "@context": "https://www.w3.org/ns/did/v1",
+        "id": "did:example:123",
+        "service": [
+            {
+                "id": "#service-0",
+                "type": "example",
+                "serviceEndpoint": {"nested": [{"uri": "https://example.com"}]},
+            }
+        ],
+    }
+    with pytest.raises(pydid.LimitExceededError):
+        pydid.deserialize_document(doc_raw, limits=limits)
+    pydid.deserialize_document(
+        doc_raw,
+        limits=pydid.DocumentLimits(max_depth=6, max_nodes=20, max_size=200),
+        strict=True,
+    )
+
+
+def test_nonconformant_deeply_nested():
+    nested = {"id": "#leaf"}
+    for index in range(sys.getrecursionlimit() * 2):
+        nested = {"id": "#node-{}".format(index), "child": [nested]}
+    doc = pydid.NonconformantDocument.deserialize(
+        {"id": "did:example:123", "service": [nested]}
+    )
+    assert doc.dereference("#leaf").id == "#leaf"
+
+
+def test_deserialize_with_cache():
+    calls = []
+
+    def counting(value):
+        calls.append(value["id"])
+        return value
+
+    cache = pydid.DocumentCache(max_entries=2)
+    first = pydid.deserialize_document(DOCS[0], [counting], cache=cache)
+    second = pydid.deserialize_document(
+        json.loads(json.dumps(DOCS[0])), [counting], cache=cache
+    )
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert second is not first
+    assert second.serialize() == first.serialize()
+
+    pydid.deserialize_document(DOCS[0], cache=cache)
+    assert len(cache) == 2
+    pydid.deserialize_document(DOCS[1], cache=cache)
+    assert len(cache) == 2
+    pydid.deserialize_document(DOCS[0], [counting], cache=cache)
+    assert len(calls) == 2
+
+
+def test_deserialize_with_cache_nonconformant():
+    doc_raw = {
+        "id": "did:example:123",
+        "verificationMethod": [{"id": "#key-0", "type": "Unknown"}],
+        "authentication": "not a list",
+    }
+    cache = pydid.DocumentCache()
+    pydid.deserialize_document(doc_raw, cache=cache)
+    hit = pydid.deserialize_document(doc_raw, cache=cache)
+    assert isinstance(hit, pydid.NonconformantDocument)
+    hit.verification_method.append({"id": "#key-1", "type": "Unknown"})
+    hit.build_index()
+    assert len(pydid.deserialize_document(doc_raw, cache=cache).verification_method) == 1
+    assert "#key-1" not in pydid.deserialize_document(doc_raw, cache=cache)._index
+
+
+def test_document_cache_max_bytes():
+    cache = pydid.DocumentCache(max_bytes=len(json.dumps(DOCS[0])), clone=False)
+    first = pydid.deserialize_document(DOCS[0], cache=cache)
+    assert pydid.deserialize_document(DOCS[0], cache=cache) is first
+    pydid.deserialize_document(DOCS[1], cache=cache)
+    assert cache.size <= cache.max_bytes
+    assert len(cache) <= 1
+
+
+def test_deserialize_with_cache_deeply_nested():
+    nested = {"id": "#leaf"}
+    for index in range(5000):
+        nested = {"id": "#node-{}".format(index), "child": [nested]}
+    doc_raw = {"id": "did:example:123", "service": [nested]}
+    cache = pydid.DocumentCache()
+    with pytest.raises(pydid.LimitExceededError):
+        pydid.deserialize_document(
+            doc_raw, limits=pydid.DocumentLimits(max_depth=32), cache=cache
+        )
+    assert pydid.DocumentCache.key(doc_raw) is None
+    assert not len(cache)
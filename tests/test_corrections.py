@@ -1,8 +1,16 @@
 """Test DID Document corrections."""
 
+import sys
+from copy import deepcopy
+
 import pytest
 
-from pydid.doc.corrections import insert_missing_ids
+from pydid.doc.corrections import (
+    Correction,
+    CorrectionPipeline,
+    insert_missing_ids,
+    public_key_is_verification_method,
+)
 
 
 def test_insert_missing_ids():
@@ -18,3 +26,190 @@ def test_insert_missing_ids():
 def test_insert_missing_ids_x():
     with pytest.raises(ValueError):
         insert_missing_ids({})
+
+
+def test_insert_missing_ids_nested_lists():
+    inserted = insert_missing_ids(
+        {
+            "id": "did:example:123",
+            "verificationMethod": [[{"a": 1}, [{"b": 2}]], {"id": "#key-0"}],
+            "service": {"c": 3},
+        }
+    )
+    assert inserted["verificationMethod"][0][0]["id"] == "did:example:123#inserted-0"
+    assert inserted["verificationMethod"][0][1][0]["id"] == ("did:example:123#inserted-1")
+    assert inserted["verificationMethod"][1]["id"] == "#key-0"
+    assert inserted["service"]["id"] == "did:example:123#inserted-2"
+
+
+def test_insert_missing_ids_deeply_nested():
+    nested = [{}]
+    for _ in range(sys.getrecursionlimit() * 2):
+        nested = [nested]
+    inserted = insert_missing_ids({"id": "did:example:123", "deep": nested})
+    assert inserted["deep"]
+
+
+class Recorder(Correction):
+    keys = ("service",)
+
+    def __init__(self):
+        self.seen = []
+
+    def correct_member(self, key, member, state):
+        self.seen.append((key, member.get("id")))
+        return {**member, "recorded": True}
+
+
+def test_pipeline_fuses_corrections():
+    recorder = Recorder()
+    pipeline = CorrectionPipeline(
+        [public_key_is_verification_method, insert_missing_ids, recorder]
+    )
+    value = {
+        "id": "did:example:123",
+        "publicKey": [{"type": "Example"}],
+        "service": [{"type": "Example"}],
+    }
+    corrected = pipeline(value)
+    assert corrected is value
+    assert "publicKey" not in corrected
+    # verificationMethod is moved to the end of the document
+    assert corrected["verificationMethod"][0]["id"] == "did:example:123#inserted-1"
+    assert corrected["service"][0] == {
+        "type": "Example",
+        "id": "did:example:123#inserted-0",
+        "recorded": True,
+    }
+    assert recorder.seen == [("service", "did:example:123#inserted-0")]
+
+
+@pytest.mark.parametrize(
+    "corrections",
+    [
+        [insert_missing_ids, public_key_is_verification_method],
+        [public_key_is_verification_method, insert_missing_ids],
+    ],
+)
+def test_pipeline_matches_sequential(corrections):
+    value = {
+        "id": "did:example:123",
+        "publicKey": [{"type": "Example"}],
+        "service": [{"type": "Example"}],
+    }
+    sequential = deepcopy(value)
+    for correction in corrections:
+        sequential = correction(sequential)
+    assert CorrectionPipeline(corrections)(deepcopy(value)) == sequential
+    assert CorrectionPipeline(corrections, copy_on_write=True)(value) == sequential
+
+
+def test_pipeline_splits_document_hook_after_member_hook():
+    pipeline = CorrectionPipeline([insert_missing_ids, public_key_is_verification_method])
+    assert pipeline._groups == [[0], [1]]
+    corrected = pipeline(
+        {
+            "id": "did:example:123",
+            "publicKey": [{"type": "Example"}],
+            "service": [{"type": "Example"}],
+        }
+    )
+    assert corrected["verificationMethod"][0]["id"] == "did:example:123#inserted-0"
+    assert corrected["service"][0]["id"] == "did:example:123#inserted-1"
+
+
+def test_pipeline_plain_callables():
+    calls = []
+
+    def plain(value):
+        calls.append(dict(value))
+        value["service"] = [{}]
+        return value
+
+    pipeline = CorrectionPipeline(
+        [public_key_is_verification_method, plain, insert_missing_ids]
+    )
+    corrected = pipeline({"id": "did:example:123", "publicKey": []})
+    assert calls == [{"id": "did:example:123", "verificationMethod": []}]
+    assert corrected["service"] == [{"id": "did:example:123#inserted-0"}]
+
+
+def test_pipeline_copy_on_write():
+    untouched = [{"id": "did:example:123#key-0"}]
+    value = {
+        "id": "did:example:123",
+        "publicKey": [[{"type": "Example"}], untouched],
+        "service": [{"id": "did:example:123#service-0"}],
+        "alsoKnownAs": ["did:example:456"],
+    }
+    original = deepcopy(value)
+    pipeline = CorrectionPipeline(
+        [public_key_is_verification_method, insert_missing_ids], copy_on_write=True
+    )
+    corrected = pipeline(value)
+    assert value == original
+    assert corrected is not value
+    assert corrected["verificationMethod"][0][0]["id"] == "did:example:123#inserted-0"
+    assert corrected["verificationMethod"] is not value["publicKey"]
+    assert corrected["verificationMethod"][1] is untouched
+    assert corrected["service"] is value["service"]
+    assert corrected["alsoKnownAs"] is value["alsoKnownAs"]
+
+
+def test_pipeline_copy_on_write_unchanged():
+    value = {"id": "did:example:123", "service": [{"id": "#service-0"}]}
+    assert CorrectionPipeline([insert_missing_ids], copy_on_write=True)(value) is value
+
+
+def test_pipeline_copy_on_write_plain_callables():
+    def plain(value):
+        value["service"].append({"id": "#service-1"})
+        return value
+
+    value = {"id": "did:example:123", "service": [{"id": "#service-0"}]}
+    corrected = CorrectionPipeline([plain], copy_on_write=True)(value)
+    assert value["service"] == [{"id": "#service-0"}]
+    assert len(corrected["service"]) == 2
+
+
+class Counting(Correction):
+    def __init__(self, **kwargs):
+        self.consulted = 0
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def applies(self, document):
+        self.consulted += 1
+        return document.get("apply", True)
+
+    def correct_document(self, document, state):
+        return {**document, "counted": True}
+
+
+def test_pipeline_triggers_and_methods():
+    triggered = Counting(name="triggered", triggers=("publicKey",))
+    method = Counting(name="method", methods=("example",))
+    rejected = Counting(name="rejected")
+    pipeline = CorrectionPipeline([triggered, method, rejected])
+
+    report = pipeline.apply_with_report({"id": "did:other:123", "apply": False})
+    assert report.fired == []
+    assert triggered.consulted == 0
+    assert method.consulted == 0
+    assert rejected.consulted == 1
+
+    report = pipeline.apply_with_report({"id": "did:example:123", "publicKey": []})
+    assert report.fired == ["triggered", "method", "rejected"]
+    assert report.document["counted"]
+
+
+def test_pipeline_report_fired():
+    pipeline = CorrectionPipeline([public_key_is_verification_method, insert_missing_ids])
+    report = pipeline.apply_with_report(
+        {"id": "did:example:123", "service": [{"id": "#service-0"}]}
+    )
+    assert report.fired == []
+    report = pipeline.apply_with_report({"id": "did:example:123", "publicKey": [{}]})
+    assert report.fired == ["public_key_is_verification_method", "insert_missing_ids"]
+    report = CorrectionPipeline([lambda value: value]).apply_with_report({})
+    assert report.fired == ["<lambda>"]
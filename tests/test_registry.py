@@ -0,0 +1,138 @@
+"""Test verification method and service registries."""
+
+import pytest
+from typing_extensions import Literal
+
+from pydid.doc.doc import DIDDocument
+from pydid.registry import SERVICES, VERIFICATION_METHODS, TypeRegistry
+from pydid.service import DIDCommV1Service, DIDCommV2Service, Service
+from pydid.verification_method import (
+    Ed25519VerificationKey2018,
+    UnknownVerificationMethod,
+    VerificationMethod,
+)
+
+DOC = {
+    "@context": ["https://www.w3.org/ns/did/v1"],
+    "id": "did:example:123",
+    "verificationMethod": [
+        {
+            "id": "did:example:123#key-0",
+            "type": "Ed25519VerificationKey2018",
+            "controller": "did:example:123",
+            "publicKeyBase58": "1234",
+        },
+        {
+            "id": "did:example:123#key-1",
+            "type": "RegistryTestKey",
+            "controller": "did:example:123",
+            "publicKeyRegistryTest": "abcd",
+        },
+    ],
+    "authentication": [
+        "did:example:123#key-0",
+        {
+            "id": "did:example:123#key-2",
+            "type": "RegistryTestKey",
+            "controller": "did:example:123",
+            "publicKeyRegistryTest": "efgh",
+        },
+    ],
+    "service": [
+        {
+            "id": "did:example:123#service-0",
+            "type": "RegistryTestService",
+            "serviceEndpoint": "https://example.com",
+            "extraProp": "value",
+        }
+    ],
+}
+
+
+class RegistryTestKey(VerificationMethod):
+    type: Literal["RegistryTestKey"]
+    public_key_registry_test: str
+
+
+class RegistryTestService(Service):
+    type: Literal["RegistryTestService"]
+    extra_prop: str
+
+
+@pytest.fixture
+def registered():
+    VERIFICATION_METHODS.register(RegistryTestKey)
+    SERVICES.register(RegistryTestService)
+    yield
+    VERIFICATION_METHODS.unregister(RegistryTestKey)
+    SERVICES.unregister(RegistryTestService)
+
+
+def test_known_types_registered():
+    assert VERIFICATION_METHODS.lookup("Ed25519VerificationKey2018") == [
+        Ed25519VerificationKey2018
+    ]
+    assert SERVICES.lookup("DIDCommMessaging") == [DIDCommV1Service, DIDCommV2Service]
+    assert "RegistryTestKey" not in VERIFICATION_METHODS
+
+
+def test_unregistered_types_use_fallback():
+    doc = DIDDocument.deserialize(DOC)
+    assert isinstance(doc.verification_method[0], Ed25519VerificationKey2018)
+    assert type(doc.verification_method[1]) is UnknownVerificationMethod
+    assert type(doc.service[0]) is Service
+    assert doc.serialize() == DOC
+
+
+def test_registered_types_dispatched(registered):
+    doc = DIDDocument.deserialize(DOC)
+    assert isinstance(doc.verification_method[1], RegistryTestKey)
+    assert isinstance(doc.authentication[1], RegistryTestKey)
+    assert isinstance(doc.service[0], RegistryTestService)
+    assert doc.serialize() == DOC
+
+
+def test_register_suite():
+    suite = VerificationMethod.suite("RegistryTestSuite", "publicKeySuite", str)
+    registry = TypeRegistry(VerificationMethod, UnknownVerificationMethod, [suite])
+    assert registry.lookup("RegistryTestSuite") == [suite]
+    vmethod = registry.validate(
+        {
+            "id": "did:example:123#key-0",
+            "type": "RegistryTestSuite",
+            "controller": "did:example:123",
+            "publicKeySuite": "1234",
+        }
+    )
+    assert isinstance(vmethod, suite)
+    assert vmethod.material == "1234"
+
+
+def test_register_x():
+    registry = TypeRegistry(VerificationMethod, UnknownVerificationMethod)
+    with pytest.raises(TypeError):
+        registry.register(Service)
+    with pytest.raises(ValueError):
+        registry.register(UnknownVerificationMethod)
+    registry.register(UnknownVerificationMethod, types=["Anything"])
+    assert registry.lookup("Anything") == [UnknownVerificationMethod]
+
+
+def test_json_schema():
+    schema = DIDDocument.model_json_schema()
+    assert {"Ed25519VerificationKey2018", "UnknownVerificationMethod"} <= set(
+        schema["$defs"]
+    )
+    (methods, _) = schema["properties"]["verificationMethod"]["anyOf"]
+    assert {"$ref": "#/$defs/UnknownVerificationMethod"} in methods["items"]["anyOf"]
+    (services, _) = schema["properties"]["service"]["anyOf"]
+    assert services["items"]["anyOf"] == [
+        {"$ref": "#/$defs/DIDCommV1Service"},
+        {"$ref": "#/$defs/DIDCommV2Service"},
+        {"$ref": "#/$defs/Service"},
+    ]
+
+
+def test_json_schema_registered(registered):
+    schema = DIDDocument.model_json_schema()
+    assert {"RegistryTestKey", "RegistryTestService"} <= set(schema["$defs"])
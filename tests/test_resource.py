@@ -1,10 +1,12 @@
 """Test Resource."""
 
+import json
 from typing import Callable, Generator, Optional, Type
 
 import pytest
 
-from pydid.resource import IndexedResource, Resource
+from pydid.resource import IndexedResource, Resource, canonical_json
+from pydid.validation import WrappedValidationError, wrap_validation_error
 from pydid.verification_method import (
     Ed25519VerificationKey2018,
     KnownVerificationMethods,
@@ -110,3 +112,97 @@ def test_dereference_as_vmethod_using_known_methods_x(mock_indexed_resource_fact
     test = mock_indexed_resource_factory(resource)
     with pytest.raises(ValueError):
         test.dereference_as(KnownVerificationMethods, "test")
+
+
+def test_deserialize_error_rendered_lazily():
+    class Test(Resource):
+        one: str
+
+    with pytest.raises(ValueError) as excinfo:
+        Test.deserialize({"one": 1})
+
+    error = excinfo.value
+    assert isinstance(error, WrappedValidationError)
+    assert error._rendered is None
+    assert error.error_count() == 1
+    assert error.errors()[0]["loc"] == ("one",)
+    assert error._rendered is None
+    assert str(error).startswith("Failed to deserialize Test:\n")
+    assert error._rendered is not None
+
+
+def test_wrap_validation_error_custom_type():
+    class Custom(Exception):
+        pass
+
+    class Test(Resource):
+        one: str
+
+    with pytest.raises(Custom) as excinfo:
+        with wrap_validation_error(Custom):
+            Test.model_validate({})
+
+    assert isinstance(excinfo.value, WrappedValidationError)
+    assert excinfo.value.errors()[0]["type"] == "missing"
+    assert "one" in str(excinfo.value)
+
+
+def test_digest_cached_and_invalidated():
+    class Test(Resource):
+        one: str
+
+    test = Test(one="test")
+    digest = test.digest()
+    assert test._digest == digest
+    assert Test(one="test").digest() == digest
+    test.one = "changed"
+    assert test._digest is None
+    assert test.digest() != digest
+    test.one = "test"
+    assert test.digest() == digest
+
+
+def test_canonical_json_matches_serialized():
+    class Nested(Resource):
+        two: Optional[str] = None
+
+    class Test(Resource):
+        one: str
+        nested: Nested
+        items: list
+
+    test = Test(one="é\n", nested=Nested(), items=[{"b": None, "a": 1}], extra=True)
+    expected = json.dumps(
+        test.serialize(), sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode()
+    assert test.canonical_json() == expected
+    assert canonical_json(test.serialize()) == expected
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (0.0, "0"),
+        (-0.0, "0"),
+        (1.0, "1"),
+        (-1.5, "-1.5"),
+        (1e21, "1e+21"),
+        (1e20, "100000000000000000000"),
+        (1e-7, "1e-7"),
+        (0.000001, "0.000001"),
+        (123.456e-10, "1.23456e-8"),
+        (2**53, "9007199254740992"),
+        (2**60, "1152921504606847000"),
+        (True, "true"),
+    ],
+)
+def test_canonical_json_numbers(value, expected):
+    assert canonical_json(value) == expected.encode()
+
+
+def test_canonical_json_key_order():
+    assert canonical_json({"\u20ac": 1, "\U0001f600": 2, "\r": 3}) == (
+        '{"\\r":3,"\u20ac":1,"\U0001f600":2}'.encode()
+    )
+    with pytest.raises(ValueError):
+        canonical_json(float("nan"))
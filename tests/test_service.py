@@ -6,7 +6,12 @@ import pytest
 from pydantic import TypeAdapter
 
 from pydid import Service
-from pydid.service import DIDCommV1Service, DIDCommV2Service
+from pydid.service import (
+    DIDCommV1Service,
+    DIDCommV2Service,
+    LazyEndpoint,
+    lazy_endpoints,
+)
 
 DIDCommServiceValidator = TypeAdapter(Union[DIDCommV1Service, DIDCommV2Service])
 
@@ -239,3 +244,52 @@ def test_use_endpoint():
     service = Service.deserialize(SERVICES[0])
     assert service.service_endpoint == "https://bar.example.com"
     assert "https" in service.service_endpoint
+
+
+def test_lazy_endpoints():
+    with lazy_endpoints():
+        services = [Service.deserialize(service) for service in SERVICES]
+    endpoint = services[0].service_endpoint
+    assert isinstance(endpoint, LazyEndpoint)
+    assert endpoint == "https://bar.example.com"
+    assert endpoint.kind == "url"
+    assert endpoint.url is endpoint.url
+    assert endpoint.url.host == "bar.example.com"
+    assert [service.serialize() for service in services] == SERVICES
+
+
+@pytest.mark.parametrize(
+    "value, kind",
+    [
+        ("did:example:123", "did"),
+        ("did:example:123#key-1", "did_url"),
+        ("https://example.com/path", "url"),
+        ("not a url", "string"),
+    ],
+)
+def test_lazy_endpoint_kind(value, kind):
+    assert LazyEndpoint(value).kind == kind
+
+
+def test_lazy_endpoint_deferred_errors():
+    with lazy_endpoints():
+        service = Service.deserialize(
+            {"id": "#s", "type": "t", "serviceEndpoint": "http://"}
+        )
+    with pytest.raises(ValueError):
+        service.service_endpoint.url
+    assert LazyEndpoint("did:example:123#k").did_url.fragment == "k"
+
+
+def test_lazy_endpoints_scoped():
+    with lazy_endpoints():
+        with lazy_endpoints(False):
+            service = Service.deserialize(SERVICES[0])
+        assert not isinstance(service.service_endpoint, LazyEndpoint)
+    service = Service.deserialize(SERVICES[0])
+    assert not isinstance(service.service_endpoint, LazyEndpoint)
+    with lazy_endpoints():
+        service = DIDCommV2Service.deserialize(
+            {"id": "#s", "serviceEndpoint": {"uri": "https://example.com"}}
+        )
+    assert isinstance(service.service_endpoint.uri, LazyEndpoint)